@@ -0,0 +1,27 @@
+"""add view and delivery indexes
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7b8c9d0e1f2'
+down_revision: Union[str, None] = 'f6a7b8c9d0e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_views_project_active_name', 'views', ['project_id', 'is_active', 'name'], unique=False)
+    op.create_index('ix_deliveries_webhook_created', 'webhook_deliveries', ['webhook_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_deliveries_webhook_created', table_name='webhook_deliveries')
+    op.drop_index('ix_views_project_active_name', table_name='views')
@@ -0,0 +1,27 @@
+"""add view compiled plan
+
+Revision ID: e5f6a7b8c9d0
+Revises: drop_app_users_001
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f6a7b8c9d0'
+down_revision: Union[str, None] = 'drop_app_users_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Parsed execution plan; NULL for existing views, which are compiled lazily
+    op.add_column('views', sa.Column('compiled_plan_json', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('views', 'compiled_plan_json')
@@ -0,0 +1,49 @@
+"""add webhook events table
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+import json
+from typing import Sequence, Union
+from uuid import uuid4
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a7b8c9d0e1'
+down_revision: Union[str, None] = 'e5f6a7b8c9d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    webhook_events = op.create_table('webhook_events',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('webhook_id', sa.String(), nullable=False),
+    sa.Column('project_id', sa.String(), nullable=False),
+    sa.Column('event_type', sa.String(length=64), nullable=False),
+    sa.ForeignKeyConstraint(['webhook_id'], ['webhooks.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_webhook_events_webhook_id'), 'webhook_events', ['webhook_id'], unique=False)
+    op.create_index('ix_webhook_events_project_event', 'webhook_events', ['project_id', 'event_type'], unique=False)
+
+    # Backfill subscriptions from the JSON events column of existing webhooks
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, project_id, events FROM webhooks")).fetchall()
+    op.bulk_insert(webhook_events, [
+        {"id": str(uuid4()), "webhook_id": row.id, "project_id": row.project_id, "event_type": event_type}
+        for row in rows
+        for event_type in set(json.loads(row.events))
+    ])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_webhook_events_project_event', table_name='webhook_events')
+    op.drop_index(op.f('ix_webhook_events_webhook_id'), table_name='webhook_events')
+    op.drop_table('webhook_events')
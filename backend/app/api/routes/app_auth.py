@@ -426,30 +426,11 @@ def get_oauth_url(
 # Meta / Documentation endpoint
 # ============================================================================
 
-@router.get("/meta")
-def get_auth_meta(
-    request: Request,
-    project: Project = Depends(deps.get_project_public),
-    db: Session = Depends(deps.get_db),
-):
+def _build_auth_meta_docs(auth_base: str, enable_email_password: bool) -> tuple[list, dict, dict]:
     """
-    Get self-documenting API information for app user authentication.
-    Returns enabled providers, endpoints, schemas, and usage examples.
+    Endpoint list, response schemas and examples for /meta. Built per request,
+    since the URL prefix comes from the request's host.
     """
-    # Get auth settings
-    auth_settings = db.query(ProjectAuthSettings).filter(
-        ProjectAuthSettings.project_id == project.id
-    ).first()
-    
-    if not auth_settings:
-        auth_settings = ProjectAuthSettings(project_id=project.id)
-        db.add(auth_settings)
-        db.commit()
-        db.refresh(auth_settings)
-    
-    base_url = str(request.base_url).rstrip("/")
-    auth_base = f"{base_url}/api/projects/{project.id}/auth"
-    
     # Build endpoints list based on enabled providers
     endpoints = []
     
@@ -462,7 +443,7 @@ def get_auth_meta(
         "auth_required": False,
     })
     
-    if auth_settings.enable_email_password:
+    if enable_email_password:
         endpoints.extend([
             {
                 "name": "Register",
@@ -585,6 +566,41 @@ const user = await response.json();''',
         },
     }
     
+    response_schemas = {
+        "token_pair": token_response,
+        "user": user_response,
+    }
+    return endpoints, response_schemas, examples
+
+
+@router.get("/meta")
+def get_auth_meta(
+    request: Request,
+    project: Project = Depends(deps.get_project_public),
+    db: Session = Depends(deps.get_db),
+):
+    """
+    Get self-documenting API information for app user authentication.
+    Returns enabled providers, endpoints, schemas, and usage examples.
+    """
+    # Get auth settings
+    auth_settings = db.query(ProjectAuthSettings).filter(
+        ProjectAuthSettings.project_id == project.id
+    ).first()
+    
+    if not auth_settings:
+        auth_settings = ProjectAuthSettings(project_id=project.id)
+        db.add(auth_settings)
+        db.commit()
+        db.refresh(auth_settings)
+    
+    base_url = str(request.base_url).rstrip("/")
+    auth_base = f"{base_url}/api/projects/{project.id}/auth"
+    
+    endpoints, response_schemas, examples = _build_auth_meta_docs(
+        auth_base, auth_settings.enable_email_password
+    )
+    
     return {
         "project_id": project.id,
         "project_name": project.name,
@@ -608,10 +624,7 @@ const user = await response.json();''',
             "note": "Include access token in Authorization header for authenticated endpoints",
         },
         "endpoints": endpoints,
-        "response_schemas": {
-            "token_pair": token_response,
-            "user": user_response,
-        },
+        "response_schemas": response_schemas,
         "examples": examples,
         "error_codes": {
             "400": "Bad request - invalid input or auth method not enabled",
@@ -23,11 +23,11 @@ async def upload_file(
 ):
     """Upload a file."""
     try:
-        content = await file.read()
+        # The spooled upload is streamed to storage instead of read into memory
         stored_file = file_service.upload_file(
             db=db,
             project=project,
-            file_content=content,
+            file_content=file.file,
             original_filename=file.filename or "unnamed",
             content_type=file.content_type,
             bucket=bucket,
@@ -10,7 +10,7 @@ from app.models.collection import Collection
 from app.models.field import Field
 from app.models.user import User
 from app.models.validation_rule import ValidationRule
-from app.schemas.validation import ValidationRuleCreate, ValidationRuleUpdate, ValidateRequest
+from app.schemas.validation import ValidationRuleCreate, ValidationRuleUpdate, ValidateRequest, ValidateBatchRequest
 from app.services import validation_service
 
 router = APIRouter()
@@ -127,27 +127,30 @@ def delete_validation_rule(
     validation_service.delete_validation_rule(db, rule)
 
 
-@router.post("/collections/{collection_name}/validate")
-def validate_record(
-    collection_name: str,
-    request: ValidateRequest,
-    project=Depends(deps.get_project_member),
-    db: Session = Depends(deps.get_db),
-):
-    """Validate a record against all field rules."""
+def get_collection_fields_or_404(db: Session, project_id: str, collection_name: str) -> list[Field]:
     collection = db.query(Collection).filter(
-        Collection.project_id == project.id,
+        Collection.project_id == project_id,
         Collection.name == collection_name,
         Collection.is_active == True,
     ).first()
     if not collection:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Collection not found")
     
-    fields = db.query(Field).filter(
+    return db.query(Field).filter(
         Field.collection_id == collection.id,
         Field.is_deleted == False,
     ).all()
-    
+
+
+@router.post("/collections/{collection_name}/validate")
+def validate_record(
+    collection_name: str,
+    request: ValidateRequest,
+    project=Depends(deps.get_project_member),
+    db: Session = Depends(deps.get_db),
+):
+    """Validate a record against all field rules."""
+    fields = get_collection_fields_or_404(db, project.id, collection_name)
     errors = validation_service.validate_record(db, fields, request.data)
     
     return {
@@ -156,6 +159,25 @@ def validate_record(
     }
 
 
+@router.post("/collections/{collection_name}/validate/batch")
+def validate_records(
+    collection_name: str,
+    request: ValidateBatchRequest,
+    project=Depends(deps.get_project_member),
+    db: Session = Depends(deps.get_db),
+):
+    """Validate several records in one request; results follow the input order."""
+    fields = get_collection_fields_or_404(db, project.id, collection_name)
+    results = validation_service.validate_records(db, fields, request.records)
+    
+    return {
+        "results": [
+            {"is_valid": len(errors) == 0, "errors": errors}
+            for errors in results
+        ],
+    }
+
+
 @router.get("/rule-types")
 def get_rule_types(
     project=Depends(deps.get_project_member),
@@ -2,10 +2,15 @@
 Views API Routes - Milestone L
 """
 import json
+
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
 
 from app.api import deps
+from app.db.session import SessionLocal
 from app.models.user import User
 from app.schemas.view import ViewCreate, ViewUpdate, ViewExecuteRequest
 from app.services import view_service
@@ -83,7 +88,7 @@ def update_view(
     current_user: User = Depends(deps.get_current_user),
 ):
     """Update a view."""
-    view = view_service.get_view(db, project.id, view_name)
+    view = view_service.load_view(db, project.id, view_name)
     if not view:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="View not found")
     
@@ -112,7 +117,7 @@ def delete_view(
     db: Session = Depends(deps.get_db),
 ):
     """Delete a view."""
-    view = view_service.get_view(db, project.id, view_name)
+    view = view_service.load_view(db, project.id, view_name)
     if not view:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="View not found")
     
@@ -148,7 +153,7 @@ def get_view_versions(
     ]
 
 
-@router.post("/{view_name}/execute")
+@router.post("/{view_name}/execute", response_class=ORJSONResponse)
 def execute_view(
     view_name: str,
     request: ViewExecuteRequest,
@@ -171,9 +176,60 @@ def execute_view(
             offset=request.offset,
             current_user_id=current_user.id,
         )
-        return result
+        # Rows are plain dicts of JSON-native values; skip jsonable_encoder
+        return ORJSONResponse(result)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.post("/{view_name}/execute/stream")
+def execute_view_stream(
+    view_name: str,
+    request: ViewExecuteRequest,
+    project=Depends(deps.get_project_member),
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    """Execute a view and stream the results without buffering the whole page."""
+    view = view_service.get_view(db, project.id, view_name)
+    if not view:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="View not found")
+    
+    # The body is read after this handler returns, when the request session may
+    # already be closed, so the cursor gets a session of its own on the same bind
+    stream_db = SessionLocal(bind=db.get_bind())
+    try:
+        meta, rows = view_service.execute_view_stream(
+            db=stream_db,
+            project=project,
+            view=view,
+            params=request.params,
+            limit=request.limit,
+            offset=request.offset,
+        )
     except ValueError as e:
+        stream_db.close()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception:
+        stream_db.close()
+        raise
+    
+    def _encode():
+        # Same body shape as /execute, written row by row
+        try:
+            yield orjson.dumps(meta)[:-1] + b',"data":['
+            separator = b""
+            for row in rows:
+                yield separator + orjson.dumps(dict(row))
+                separator = b","
+            yield b"]}"
+        finally:
+            stream_db.close()
+    
+    # The background close also covers a body that was never started
+    return StreamingResponse(
+        _encode(), media_type="application/json", background=BackgroundTask(stream_db.close),
+    )
 
 
 @router.get("/{view_name}/meta")
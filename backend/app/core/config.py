@@ -11,10 +11,19 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    BCRYPT_ROUNDS: int = 12
     API_CORS_ORIGINS: str = "http://localhost:5173,http://localhost:3000"
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
+    @field_validator("BCRYPT_ROUNDS")
+    @classmethod
+    def _check_bcrypt_rounds(cls, value: int) -> int:
+        # bcrypt only accepts cost factors 4-31; fail at startup, not on first hash
+        if not 4 <= value <= 31:
+            raise ValueError("BCRYPT_ROUNDS must be between 4 and 31")
+        return value
+
     @property
     def cors_origins(self) -> List[str]:
         if not self.API_CORS_ORIGINS:
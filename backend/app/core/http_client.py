@@ -0,0 +1,30 @@
+"""
+Shared outbound HTTP client for webhook deliveries and workflow steps.
+
+A single pooled AsyncClient lets repeated calls to the same host reuse
+keep-alive connections instead of paying a TCP/TLS handshake each time.
+"""
+from typing import Optional
+
+import httpx
+
+HTTP_TIMEOUT_SECONDS = 30.0
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=100, max_connections=200)
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+async def get_http_client() -> httpx.AsyncClient:
+    """Get the shared client, creating it lazily on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(timeout=HTTP_TIMEOUT_SECONDS, limits=HTTP_LIMITS)
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared client and release its pooled connections."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
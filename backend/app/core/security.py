@@ -14,7 +14,7 @@ def verify_password(plain_password: str, password_hash: str) -> bool:
 
 
 def get_password_hash(password: str) -> str:
-    hashed = bcrypt.hashpw(_bcrypt_safe_password(password), bcrypt.gensalt())
+    hashed = bcrypt.hashpw(_bcrypt_safe_password(password), bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS))
     return hashed.decode("utf-8")
 
 
@@ -0,0 +1,54 @@
+"""
+Short-lived in-process cache for rarely changing ORM rows (views, webhooks).
+
+Entries are detached column snapshots rather than session-bound instances;
+a hit is attached to the caller's session with merge(load=False), which
+issues no SELECT. Writers in this process invalidate their keys; other
+processes may serve a stale row for at most the TTL.
+"""
+import time
+from threading import Lock
+from typing import Any, Hashable, Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+
+class ModelCache:
+    """TTL cache of detached ORM snapshots keyed by an arbitrary hashable key."""
+
+    def __init__(self, ttl_seconds: float = 5.0, maxsize: int = 4096):
+        self._ttl = ttl_seconds
+        self._maxsize = maxsize
+        self._entries: dict[Hashable, tuple[float, Any]] = {}
+        self._lock = Lock()
+
+    def get(self, db: Session, key: Hashable) -> Optional[Any]:
+        """Return the cached row attached to db, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, snapshot = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+        return db.merge(snapshot, load=False)
+
+    def put(self, key: Hashable, obj: Any) -> None:
+        """Store a snapshot of a freshly loaded, unmodified row."""
+        mapper = inspect(obj).mapper
+        snapshot = mapper.class_(**{attr.key: getattr(obj, attr.key) for attr in mapper.column_attrs})
+        make_transient_to_detached(snapshot)
+        with self._lock:
+            if len(self._entries) >= self._maxsize:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (time.monotonic() + self._ttl, snapshot)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
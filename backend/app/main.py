@@ -1,15 +1,17 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from app.api.router import api_router
 from app.core.config import settings
+from app.core.http_client import close_http_client
 
 app = FastAPI(
     title="Backendify BaaS",
     version="0.1.0",
     description="Backend as a Service with multi-tenant app user authentication",
+    default_response_class=ORJSONResponse,
 )
 
 
@@ -42,6 +44,11 @@ app.add_middleware(
 )
 
 
+@app.on_event("shutdown")
+async def shutdown_http_client():
+    await close_http_client()
+
+
 @app.get("/health")
 def health_check():
     return {"ok": True}
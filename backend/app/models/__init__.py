@@ -14,12 +14,12 @@ from app.models.schema_op import SchemaOp
 from app.models.user import User
 from app.models.validation_rule import ValidationRule
 from app.models.view import View, ViewVersion
-from app.models.webhook import Webhook, WebhookDelivery
+from app.models.webhook import Webhook, WebhookDelivery, WebhookEvent
 from app.models.workflow import Workflow, WorkflowRun, WorkflowStep
 
 __all__ = [
     "ApiKey", "AppRefreshToken", "ProjectAuthSettings", "AppOtpCode", "AppIdentity", "AppEmailToken",
     "AuditEvent", "Collection", "CollectionAlias", "Field", "FieldAlias", "Membership", "Policy", "Project",
     "RefreshToken", "Role", "AppUserRole", "SchemaOp", "StoredFile", "User",
-    "ValidationRule", "View", "ViewVersion", "Webhook", "WebhookDelivery", "Workflow", "WorkflowRun", "WorkflowStep"
+    "ValidationRule", "View", "ViewVersion", "Webhook", "WebhookDelivery", "WebhookEvent", "Workflow", "WorkflowRun", "WorkflowStep"
 ]
@@ -1,7 +1,7 @@
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text, func
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -10,6 +10,10 @@ from app.db.base import Base
 class View(Base):
     """Saved query definition - generates read-only API endpoints."""
     __tablename__ = "views"
+    __table_args__ = (
+        # Serves get_view (equality on all three) and list_views (ordered by name)
+        Index("ix_views_project_active_name", "project_id", "is_active", "name"),
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid4()))
     project_id: Mapped[str] = mapped_column(String, ForeignKey("projects.id"), nullable=False, index=True)
@@ -24,6 +28,7 @@ class View(Base):
     sorts_json: Mapped[str | None] = mapped_column(Text, nullable=True)
     joins_json: Mapped[str | None] = mapped_column(Text, nullable=True)
     params_schema_json: Mapped[str | None] = mapped_column(Text, nullable=True)
+    compiled_plan_json: Mapped[str | None] = mapped_column(Text, nullable=True)
     
     default_limit: Mapped[int] = mapped_column(Integer, default=100, nullable=False)
     max_limit: Mapped[int] = mapped_column(Integer, default=1000, nullable=False)
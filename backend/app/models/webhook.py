@@ -1,7 +1,8 @@
+import json
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, String, Text, func
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -22,9 +23,37 @@ class Webhook(Base):
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
 
+    @property
+    def events_set(self) -> frozenset[str]:
+        """Subscribed event types, parsed once per instance and per events value."""
+        cached = self.__dict__.get("_events_set")
+        if cached is None or cached[0] is not self.events:
+            cached = (self.events, frozenset(json.loads(self.events)))
+            self.__dict__["_events_set"] = cached
+        return cached[1]
+
+
+class WebhookEvent(Base):
+    """Event subscription of a webhook, denormalized so event lookups filter in SQL."""
+    __tablename__ = "webhook_events"
+    __table_args__ = (
+        Index("ix_webhook_events_project_event", "project_id", "event_type"),
+    )
+
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid4()))
+    webhook_id: Mapped[str] = mapped_column(
+        String, ForeignKey("webhooks.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    project_id: Mapped[str] = mapped_column(String, ForeignKey("projects.id"), nullable=False)
+    event_type: Mapped[str] = mapped_column(String(64), nullable=False)
+
 
 class WebhookDelivery(Base):
     __tablename__ = "webhook_deliveries"
+    __table_args__ = (
+        Index("ix_deliveries_webhook_created", "webhook_id", "created_at"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid4()))
     webhook_id: Mapped[str] = mapped_column(String, ForeignKey("webhooks.id"), nullable=False, index=True)
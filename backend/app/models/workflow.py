@@ -26,6 +26,7 @@ class Workflow(Base):
 
 class WorkflowRun(Base):
     __tablename__ = "workflow_runs"
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid4()))
     workflow_id: Mapped[str] = mapped_column(String, ForeignKey("workflows.id"), nullable=False, index=True)
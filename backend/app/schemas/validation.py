@@ -35,6 +35,10 @@ class ValidateRequest(BaseModel):
     data: dict[str, Any]
 
 
+class ValidateBatchRequest(BaseModel):
+    records: list[dict[str, Any]] = Field(..., max_length=1000)
+
+
 class ValidateResponse(BaseModel):
     is_valid: bool
     errors: dict[str, list[str]]
@@ -17,6 +17,8 @@ from app.models.project import Project
 
 UPLOAD_DIR = os.environ.get("UPLOAD_DIR", "/tmp/backendify_uploads")
 MAX_FILE_SIZE = int(os.environ.get("MAX_FILE_SIZE", 10 * 1024 * 1024))
+# Streamed uploads are copied to disk this many bytes at a time
+UPLOAD_CHUNK_SIZE = 64 * 1024
 ALLOWED_EXTENSIONS = {"jpg", "jpeg", "png", "gif", "webp", "pdf", "txt", "csv", "json", "xml", "doc", "docx", "xls", "xlsx"}
 
 
@@ -53,7 +55,7 @@ def generate_unique_filename(original_filename: str) -> str:
 def upload_file(
     db: Session,
     project: Project,
-    file_content: bytes,
+    file_content: bytes | BinaryIO,
     original_filename: str,
     content_type: str | None = None,
     bucket: str | None = None,
@@ -63,14 +65,18 @@ def upload_file(
     is_public: bool = False,
     uploaded_by_user_id: str | None = None,
 ) -> StoredFile:
-    """Upload a file and store its metadata."""
+    """
+    Upload a file and store its metadata.
+    
+    file_content may be bytes or a binary file object; a file object is copied
+    to storage in chunks, so the upload is never held in memory as a whole.
+    """
     if not is_allowed_extension(original_filename):
         ext = get_file_extension(original_filename)
         raise ValueError(f"File extension '{ext}' is not allowed. Allowed: {', '.join(ALLOWED_EXTENSIONS)}")
     
-    size_bytes = len(file_content)
-    if size_bytes > MAX_FILE_SIZE:
-        raise ValueError(f"File size {size_bytes} exceeds maximum allowed size of {MAX_FILE_SIZE} bytes")
+    if isinstance(file_content, bytes) and len(file_content) > MAX_FILE_SIZE:
+        raise ValueError(f"File size {len(file_content)} exceeds maximum allowed size of {MAX_FILE_SIZE} bytes")
     
     if not content_type:
         content_type, _ = mimetypes.guess_type(original_filename)
@@ -80,8 +86,12 @@ def upload_file(
     unique_filename = generate_unique_filename(original_filename)
     storage_path = project_dir / unique_filename
     
-    with open(storage_path, "wb") as f:
-        f.write(file_content)
+    if isinstance(file_content, bytes):
+        with open(storage_path, "wb") as f:
+            f.write(file_content)
+        size_bytes = len(file_content)
+    else:
+        size_bytes = _copy_to_storage(file_content, storage_path)
     
     stored_file = StoredFile(
         project_id=project.id,
@@ -105,6 +115,22 @@ def upload_file(
     return stored_file
 
 
+def _copy_to_storage(source: BinaryIO, storage_path: Path) -> int:
+    """Copy a file object to storage_path chunk by chunk and return its size."""
+    size_bytes = 0
+    with open(storage_path, "wb") as f:
+        while chunk := source.read(UPLOAD_CHUNK_SIZE):
+            size_bytes += len(chunk)
+            if size_bytes > MAX_FILE_SIZE:
+                break
+            f.write(chunk)
+    if size_bytes > MAX_FILE_SIZE:
+        # Size is only known while copying, so drop the partial file
+        storage_path.unlink(missing_ok=True)
+        raise ValueError(f"File size exceeds maximum allowed size of {MAX_FILE_SIZE} bytes")
+    return size_bytes
+
+
 def get_file(db: Session, project_id: str, file_id: str) -> StoredFile | None:
     """Get a file by ID."""
     return db.query(StoredFile).filter(
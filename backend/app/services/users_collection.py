@@ -179,14 +179,8 @@ def _create_users_table(
             )
         """)
     
+    # email lookups are served by the index backing its UNIQUE constraint
     db.execute(create_sql)
-    
-    # Create index on email
-    if _is_sqlite(db):
-        idx_sql = text(f'CREATE INDEX "ix_{table_name}_email" ON "coll_{table_name}" ("email")')
-    else:
-        idx_sql = text(f'CREATE INDEX "ix_{table_name}_email" ON {full_table} ("email")')
-    db.execute(idx_sql)
 
 
 def get_users_collection(db: Session, project: Project) -> Collection | None:
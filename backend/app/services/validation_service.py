@@ -4,7 +4,9 @@ Handles no-code validation rules for fields.
 """
 import json
 import re
-from typing import Any
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable
 
 from sqlalchemy.orm import Session
 
@@ -31,6 +33,12 @@ EMAIL_REGEX = re.compile(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
 URL_REGEX = re.compile(r"^https?://[^\s/$.?#].[^\s]*$")
 UUID_REGEX = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.IGNORECASE)
 
+_FORMAT_REGEXES = {
+    "email": (EMAIL_REGEX, "Invalid email format"),
+    "url": (URL_REGEX, "Invalid URL format"),
+    "uuid": (UUID_REGEX, "Invalid UUID format"),
+}
+
 
 def create_validation_rule(
     db: Session,
@@ -69,6 +77,20 @@ def get_field_rules(db: Session, field_id: str) -> list[ValidationRule]:
     ).order_by(ValidationRule.priority).all()
 
 
+def get_rules_by_field(db: Session, fields: list[Field]) -> dict[str, list[ValidationRule]]:
+    """Get active validation rules for several fields in one query, keyed by field id."""
+    rules_by_field: dict[str, list[ValidationRule]] = {field.id: [] for field in fields}
+    if not rules_by_field:
+        return rules_by_field
+    rules = db.query(ValidationRule).filter(
+        ValidationRule.field_id.in_(list(rules_by_field)),
+        ValidationRule.is_active == True,
+    ).order_by(ValidationRule.priority).all()
+    for rule in rules:
+        rules_by_field[rule.field_id].append(rule)
+    return rules_by_field
+
+
 def delete_validation_rule(db: Session, rule: ValidationRule) -> None:
     """Delete a validation rule."""
     db.delete(rule)
@@ -105,81 +127,111 @@ def validate_value(value: Any, rule: ValidationRule) -> tuple[bool, str | None]:
     if value is None:
         return True, None
     
-    config = json.loads(rule.config_json) if rule.config_json else {}
-    rule_type = rule.rule_type
-    
+    check = _compile_rule(rule.rule_type, rule.config_json, rule.error_message)
     try:
-        if rule_type == "min_length":
-            min_len = config.get("min", 0)
-            if len(str(value)) < min_len:
-                return False, rule.error_message or f"Must be at least {min_len} characters"
-        
-        elif rule_type == "max_length":
-            max_len = config.get("max", 255)
-            if len(str(value)) > max_len:
-                return False, rule.error_message or f"Must be at most {max_len} characters"
-        
-        elif rule_type == "regex" or rule_type == "custom_regex":
-            pattern = config.get("pattern", "")
-            flags_str = config.get("flags", "")
-            flags = 0
-            if "i" in flags_str:
-                flags |= re.IGNORECASE
-            if "m" in flags_str:
-                flags |= re.MULTILINE
-            if not re.match(pattern, str(value), flags):
-                return False, rule.error_message or f"Does not match required pattern"
-        
-        elif rule_type == "email":
-            if not EMAIL_REGEX.match(str(value)):
-                return False, rule.error_message or "Invalid email format"
-        
-        elif rule_type == "url":
-            if not URL_REGEX.match(str(value)):
-                return False, rule.error_message or "Invalid URL format"
-        
-        elif rule_type == "uuid":
-            if not UUID_REGEX.match(str(value)):
-                return False, rule.error_message or "Invalid UUID format"
-        
-        elif rule_type == "min_value":
-            min_val = config.get("min", 0)
-            if float(value) < min_val:
-                return False, rule.error_message or f"Must be at least {min_val}"
-        
-        elif rule_type == "max_value":
-            max_val = config.get("max", 0)
-            if float(value) > max_val:
-                return False, rule.error_message or f"Must be at most {max_val}"
+        error = check(value)
+    except Exception as e:
+        return False, rule.error_message or f"Validation error: {str(e)}"
+    return error is None, error
+
+
+@lru_cache(maxsize=1024)
+def _compile_rule(
+    rule_type: str, config_json: str | None, error_message: str | None
+) -> Callable[[Any], str | None]:
+    """
+    Build the check for a rule: a callable returning an error message, or None if
+    the value passes. Cached on the rule's content, so an edited rule compiles anew.
+    """
+    config = json.loads(config_json) if config_json else {}
+    
+    if rule_type == "min_length":
+        min_len = config.get("min", 0)
+        message = error_message or f"Must be at least {min_len} characters"
+        return lambda value: message if len(str(value)) < min_len else None
+    
+    if rule_type == "max_length":
+        max_len = config.get("max", 255)
+        message = error_message or f"Must be at most {max_len} characters"
+        return lambda value: message if len(str(value)) > max_len else None
+    
+    if rule_type == "regex" or rule_type == "custom_regex":
+        flags_str = config.get("flags", "")
+        flags = 0
+        if "i" in flags_str:
+            flags |= re.IGNORECASE
+        if "m" in flags_str:
+            flags |= re.MULTILINE
+        try:
+            pattern = re.compile(config.get("pattern", ""), flags)
+        except re.error as e:
+            message = error_message or f"Validation error: {str(e)}"
+            return lambda value: message
+        message = error_message or "Does not match required pattern"
+        return lambda value: None if pattern.match(str(value)) else message
+    
+    if rule_type in _FORMAT_REGEXES:
+        pattern, default_message = _FORMAT_REGEXES[rule_type]
+        message = error_message or default_message
+        return lambda value: None if pattern.match(str(value)) else message
+    
+    if rule_type == "min_value":
+        min_val = config.get("min", 0)
+        message = error_message or f"Must be at least {min_val}"
+        return lambda value: message if float(value) < min_val else None
+    
+    if rule_type == "max_value":
+        max_val = config.get("max", 0)
+        message = error_message or f"Must be at most {max_val}"
+        return lambda value: message if float(value) > max_val else None
+    
+    if rule_type == "range":
+        min_val = config.get("min", 0)
+        max_val = config.get("max", 0)
+        message = error_message or f"Must be between {min_val} and {max_val}"
         
-        elif rule_type == "range":
-            min_val = config.get("min", 0)
-            max_val = config.get("max", 0)
+        def check_range(value: Any) -> str | None:
             val = float(value)
-            if val < min_val or val > max_val:
-                return False, rule.error_message or f"Must be between {min_val} and {max_val}"
+            return message if val < min_val or val > max_val else None
         
-        elif rule_type == "enum":
-            allowed = config.get("values", [])
-            if value not in allowed:
-                return False, rule.error_message or f"Must be one of: {', '.join(map(str, allowed))}"
+        return check_range
+    
+    if rule_type == "enum":
+        allowed = config.get("values", [])
+        message = error_message or f"Must be one of: {', '.join(map(str, allowed))}"
+        try:
+            members = frozenset(allowed)
+        except TypeError:
+            # Unhashable members (lists, objects) fall back to a linear scan
+            members = tuple(allowed)
+        
+        def check_enum(value: Any) -> str | None:
+            try:
+                return None if value in members else message
+            except TypeError:
+                # An unhashable value cannot be in a set of hashable members
+                return message
         
-        elif rule_type == "not_empty":
-            if not str(value).strip():
-                return False, rule.error_message or "Cannot be empty"
+        return check_enum
+    
+    if rule_type == "not_empty":
+        message = error_message or "Cannot be empty"
+        return lambda value: None if str(value).strip() else message
+    
+    if rule_type == "date_format":
+        fmt = config.get("format", "%Y-%m-%d")
+        message = error_message or f"Invalid date format, expected {fmt}"
         
-        elif rule_type == "date_format":
-            from datetime import datetime
-            fmt = config.get("format", "%Y-%m-%d")
+        def check_date(value: Any) -> str | None:
             try:
                 datetime.strptime(str(value), fmt)
             except ValueError:
-                return False, rule.error_message or f"Invalid date format, expected {fmt}"
+                return message
+            return None
         
-        return True, None
+        return check_date
     
-    except Exception as e:
-        return False, rule.error_message or f"Validation error: {str(e)}"
+    return lambda value: None
 
 
 def validate_field_value(db: Session, field: Field, value: Any) -> list[str]:
@@ -206,15 +258,35 @@ def validate_record(db: Session, fields: list[Field], data: dict[str, Any]) -> d
     Validate a record against all field rules.
     Returns dict of field_name -> list of errors.
     """
-    errors = {}
+    return validate_records(db, fields, [data])[0]
+
+
+def validate_records(
+    db: Session, fields: list[Field], records: list[dict[str, Any]]
+) -> list[dict[str, list[str]]]:
+    """
+    Validate several records against all field rules, loading the rules once.
+    Returns one dict of field_name -> list of errors per record, in order.
+    """
+    rules_by_field = get_rules_by_field(db, fields)
+    results = []
     
-    for field in fields:
-        value = data.get(field.sql_column_name) or data.get(field.name)
-        field_errors = validate_field_value(db, field, value)
-        if field_errors:
-            errors[field.name] = field_errors
+    for data in records:
+        errors = {}
+        for field in fields:
+            value = data.get(field.sql_column_name) or data.get(field.name)
+            if value is None:
+                continue
+            field_errors = [
+                error
+                for is_valid, error in (validate_value(value, rule) for rule in rules_by_field[field.id])
+                if not is_valid and error
+            ]
+            if field_errors:
+                errors[field.name] = field_errors
+        results.append(errors)
     
-    return errors
+    return results
 
 
 def get_available_rule_types() -> list[dict]:
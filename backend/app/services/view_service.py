@@ -3,11 +3,13 @@ View Service - Milestone L
 Handles creation and execution of saved queries (views).
 """
 import json
-from typing import Any
+from functools import lru_cache
+from typing import Any, Iterator
 
-from sqlalchemy import text
+from sqlalchemy import RowMapping, TextClause, text
 from sqlalchemy.orm import Session
 
+from app.db.cache import ModelCache
 from app.models.collection import Collection
 from app.models.field import Field
 from app.models.view import View, ViewVersion
@@ -16,9 +18,22 @@ from app.services.schema_manager import _is_sqlite, get_project_schema_name, val
 from app.services.policy_service import check_permission
 
 VALID_OPERATORS = ["=", "!=", ">", "<", ">=", "<=", "in", "not_in", "contains", "starts_with", "ends_with", "is_null", "is_not_null"]
+_VALID_OPERATORS_SET = frozenset(VALID_OPERATORS)
+_NULLARY_OPS = frozenset(("is_null", "is_not_null"))
 MAX_JOINS = 1
 MAX_FILTERS = 20
 MAX_ROWS = 1000
+VIEW_PLAN_CACHE_SIZE = 1024
+SYSTEM_SORT_FIELDS = ["id", "created_at", "updated_at"]
+TOTAL_COUNT_COLUMN = "__total"
+STREAM_BATCH_SIZE = 200
+
+# Active views keyed by (project_id, name); invalidated by create/update/delete.
+# Only read paths go through it; writers use load_view for the current row.
+_view_cache = ModelCache(ttl_seconds=5.0)
+
+# Parsed execution plans keyed by (view_id, version); a version bump yields a new key
+_view_plan_cache: dict[tuple[str, int], dict[str, Any]] = {}
 
 
 def create_view(
@@ -80,6 +95,7 @@ def create_view(
         max_limit=min(max_limit, MAX_ROWS),
         version=1,
     )
+    view.compiled_plan_json = json.dumps(_compile_view_plan(view))
     db.add(view)
     db.flush()
     
@@ -95,6 +111,8 @@ def create_view(
     )
     db.add(version)
     db.commit()
+    # A delete and re-create under the same name must not serve the old row
+    _view_cache.invalidate((view.project_id, view.name))
     db.refresh(view)
     
     return view
@@ -105,12 +123,13 @@ def _validate_filters(filters: list[dict]) -> None:
     for f in filters:
         if "field" not in f:
             raise ValueError("Filter missing 'field'")
-        if "operator" not in f:
+        op = f.get("operator")
+        if op is None:
             raise ValueError("Filter missing 'operator'")
-        if f["operator"] not in VALID_OPERATORS:
-            raise ValueError(f"Invalid operator: {f['operator']}")
-        if f["operator"] not in ["is_null", "is_not_null"] and "value" not in f:
-            raise ValueError(f"Filter with operator '{f['operator']}' requires 'value'")
+        if not isinstance(op, str) or op not in _VALID_OPERATORS_SET:
+            raise ValueError(f"Invalid operator: {op}")
+        if op not in _NULLARY_OPS and "value" not in f:
+            raise ValueError(f"Filter with operator '{op}' requires 'value'")
 
 
 def update_view(
@@ -150,6 +169,7 @@ def update_view(
         view.display_name = display_name
     if description is not None:
         view.description = description
+    view.compiled_plan_json = json.dumps(_compile_view_plan(view))
     
     version = ViewVersion(
         view_id=view.id,
@@ -163,6 +183,7 @@ def update_view(
     )
     db.add(version)
     db.commit()
+    _view_cache.invalidate((view.project_id, view.name))
     db.refresh(view)
     
     return view
@@ -170,6 +191,19 @@ def update_view(
 
 def get_view(db: Session, project_id: str, view_name: str) -> View | None:
     """Get a view by name."""
+    key = (project_id, view_name)
+    view = _view_cache.get(db, key)
+    if view is not None:
+        return view
+    
+    view = load_view(db, project_id, view_name)
+    if view is not None:
+        _view_cache.put(key, view)
+    return view
+
+
+def load_view(db: Session, project_id: str, view_name: str) -> View | None:
+    """Get a view by name from the database, bypassing the cache; for callers that modify it."""
     return db.query(View).filter(
         View.project_id == project_id,
         View.name == view_name,
@@ -198,6 +232,7 @@ def delete_view(db: Session, view: View) -> None:
     """Soft delete a view."""
     view.is_active = False
     db.commit()
+    _view_cache.invalidate((view.project_id, view.name))
 
 
 def get_view_versions(db: Session, view_id: str) -> list[ViewVersion]:
@@ -220,6 +255,87 @@ def execute_view(
     Execute a view and return results.
     L3: Runtime execution engine
     """
+    windowed_total = _uses_windowed_total(db)
+    count_sql, query_sql, bind_params, effective_limit, final_offset = _prepare_view_query(
+        db, project, view, params, limit, offset, windowed_total
+    )
+    
+    if not windowed_total:
+        total = db.execute(count_sql, bind_params).scalar()
+    
+    results = db.execute(query_sql, bind_params).mappings().all()
+    
+    if not windowed_total:
+        data = list(map(dict, results))
+    else:
+        # Total comes from the COUNT(*) OVER () column of the page query
+        data = [{k: v for k, v in r.items() if k != TOTAL_COUNT_COLUMN} for r in results]
+        if results:
+            total = results[0][TOTAL_COUNT_COLUMN]
+        elif final_offset:
+            # Empty page past the end: the window count is unavailable
+            total = db.execute(count_sql, bind_params).scalar()
+        else:
+            total = 0
+    
+    return {
+        "data": data,
+        "total": total,
+        "limit": effective_limit,
+        "offset": final_offset,
+        "view_name": view.name,
+        "view_version": view.version,
+    }
+
+
+def _uses_windowed_total(db: Session) -> bool:
+    """Whether a page query carries its total as a COUNT(*) OVER () column (Postgres)."""
+    return not _is_sqlite(db)
+
+
+def execute_view_stream(
+    db: Session,
+    project: Project,
+    view: View,
+    params: dict[str, Any] | None = None,
+    limit: int | None = None,
+    offset: int = 0,
+) -> tuple[dict[str, Any], Iterator[RowMapping]]:
+    """
+    Execute a view without materializing the page.
+    Returns the response metadata (total, limit, offset, view) and an iterator
+    over rows fetched from a server-side cursor in batches.
+    """
+    count_sql, query_sql, bind_params, effective_limit, final_offset = _prepare_view_query(
+        db, project, view, params, limit, offset, windowed_total=False
+    )
+    total = db.execute(count_sql, bind_params).scalar()
+    rows = db.execute(
+        query_sql,
+        bind_params,
+        execution_options={"stream_results": True, "max_row_buffer": STREAM_BATCH_SIZE},
+    ).mappings()
+    
+    meta = {
+        "total": total,
+        "limit": effective_limit,
+        "offset": final_offset,
+        "view_name": view.name,
+        "view_version": view.version,
+    }
+    return meta, rows
+
+
+def _prepare_view_query(
+    db: Session,
+    project: Project,
+    view: View,
+    params: dict[str, Any] | None,
+    limit: int | None,
+    offset: int,
+    windowed_total: bool,
+) -> tuple[TextClause, TextClause, dict[str, Any], int, int]:
+    """Resolve a view's parameters into its statements and bind values."""
     base_collection = db.query(Collection).filter(
         Collection.id == view.base_collection_id
     ).first()
@@ -235,67 +351,61 @@ def execute_view(
     else:
         table_name = f'"{schema_name}"."{base_collection.sql_table_name}"'
     
-    projection = json.loads(view.projection_json) if view.projection_json else ["*"]
-    filters = json.loads(view.filters_json) if view.filters_json else []
-    sorts = json.loads(view.sorts_json) if view.sorts_json else []
-    params_schema = json.loads(view.params_schema_json) if view.params_schema_json else {}
-    
-    if projection == ["*"]:
-        select_clause = "*"
-    else:
-        select_clause = ", ".join([f'"{col}"' for col in projection])
+    plan = _get_view_plan(view)
     
-    where_clauses = []
     bind_params = {}
-    
-    for i, f in enumerate(filters):
-        field = f["field"]
-        operator = f["operator"]
-        param_name = f"p{i}"
-        
-        if f.get("is_param") and params:
-            value = params.get(f.get("param_name", field))
-        else:
-            value = f.get("value")
-        
-        clause = _build_filter_clause(field, operator, value, param_name, bind_params)
-        if clause:
-            where_clauses.append(clause)
-    
-    where_sql = " AND ".join(where_clauses) if where_clauses else "1=1"
-    
-    # Build order clause - supports parameterized sort field and direction
-    order_clauses = []
-    for s in sorts:
-        # Check if sort field is parameterized
-        if s.get("is_param") and params:
-            sort_field = params.get(s.get("param_name", "sort_field"), s.get("field", "id"))
-        else:
-            sort_field = s.get("field", "id")
+    if plan.get("fast_path"):
+        # SELECT * without filters or sorts: one prebuilt statement pair per table
+        count_sql, query_sql = _build_fast_view_sql(windowed_total, table_name)
+    else:
+        filter_sig = []
+        for field_token, operator, param_name, binder, is_param, value_param, static_value in plan["bound_filters"]:
+            value = params.get(value_param) if is_param and params else static_value
+            n_values = binder(value, param_name, bind_params) if binder else 0
+            filter_sig.append((field_token, operator, n_values))
         
-        # Check if sort direction is parameterized
-        if s.get("desc_is_param") and params:
-            desc_param = params.get(s.get("desc_param_name", "sort_desc"), False)
-            direction = "DESC" if desc_param in (True, "true", "desc", "DESC", 1, "1") else "ASC"
-        else:
-            direction = "DESC" if s.get("desc", False) else "ASC"
+        sort_sig = plan["static_sort_sig"]
+        if sort_sig is None:
+            # Resolve sort fields and directions - supports parameterized sort field and direction
+            sortable_fields = plan["sortable_fields"]
+            resolved_sorts = []
+            for s in plan["sorts"]:
+                # Check if sort field is parameterized
+                if s.get("is_param") and params:
+                    sort_field = params.get(s.get("param_name", "sort_field"), s.get("field", "id"))
+                else:
+                    sort_field = s.get("field", "id")
+            
+                # Check if sort direction is parameterized
+                if s.get("desc_is_param") and params:
+                    desc_param = params.get(s.get("desc_param_name", "sort_desc"), False)
+                    direction = "DESC" if desc_param in (True, "true", "desc", "DESC", 1, "1") else "ASC"
+                else:
+                    direction = "DESC" if s.get("desc", False) else "ASC"
+            
+                # Validate sort field is in projection or is a system field
+                if sort_field and (sortable_fields is None or sort_field in sortable_fields):
+                    resolved_sorts.append((sort_field, direction))
+            sort_sig = tuple(resolved_sorts)
         
-        # Validate sort field is in projection or is a system field
-        valid_fields = projection if projection != ["*"] else []
-        system_fields = ["id", "created_at", "updated_at"]
-        if sort_field and (projection == ["*"] or sort_field in valid_fields or sort_field in system_fields):
-            order_clauses.append(f'"{sort_field}" {direction}')
-    
-    order_sql = ", ".join(order_clauses) if order_clauses else "id ASC"
+        count_sql, query_sql = _build_view_sql(
+            view.id,
+            view.version,
+            windowed_total,
+            table_name,
+            plan["select_clause"],
+            tuple(filter_sig),
+            sort_sig,
+        )
     
     # Check for parameterized limit/offset
     param_limit = None
     param_offset = None
-    for param_name, param_def in params_schema.items():
-        if param_def.get("type") == "limit" and params:
-            param_limit = params.get(param_name)
-        elif param_def.get("type") == "offset" and params:
-            param_offset = params.get(param_name)
+    if params:
+        if plan["limit_param"]:
+            param_limit = params.get(plan["limit_param"])
+        if plan["offset_param"]:
+            param_offset = params.get(plan["offset_param"])
     
     # Use parameterized values if provided, otherwise fall back to request values
     final_limit = param_limit if param_limit is not None else limit
@@ -303,72 +413,147 @@ def execute_view(
     
     effective_limit = min(final_limit or view.default_limit, view.max_limit, MAX_ROWS)
     
-    count_sql = text(f'SELECT COUNT(*) FROM {table_name} WHERE {where_sql}')
-    total = db.execute(count_sql, bind_params).scalar()
-    
-    query_sql = text(
-        f'SELECT {select_clause} FROM {table_name} WHERE {where_sql} '
-        f'ORDER BY {order_sql} LIMIT :limit OFFSET :offset'
-    )
     bind_params["limit"] = effective_limit
     bind_params["offset"] = final_offset
     
-    results = db.execute(query_sql, bind_params).mappings().all()
+    return count_sql, query_sql, bind_params, effective_limit, final_offset
+
+
+def _compile_view_plan(view: View) -> dict[str, Any]:
+    """
+    Parse a view definition into the structures execute_view needs.
+    Built on create/update and persisted in View.compiled_plan_json.
+    """
+    projection = json.loads(view.projection_json) if view.projection_json else ["*"]
+    params_schema = json.loads(view.params_schema_json) if view.params_schema_json else {}
+    
+    limit_param = None
+    offset_param = None
+    for param_name, param_def in params_schema.items():
+        if param_def.get("type") == "limit":
+            limit_param = param_name
+        elif param_def.get("type") == "offset":
+            offset_param = param_name
+    
+    if projection == ["*"]:
+        select_clause = "*"
+        sortable_fields = None
+    else:
+        select_clause = ", ".join([f'"{col}"' for col in projection])
+        sortable_fields = projection + SYSTEM_SORT_FIELDS
+    
+    filters = json.loads(view.filters_json) if view.filters_json else []
+    sorts = json.loads(view.sorts_json) if view.sorts_json else []
+    
+    # Sorts without parameters resolve to the same ORDER BY on every request
+    static_sort_sig = None
+    if not any(s.get("is_param") or s.get("desc_is_param") for s in sorts):
+        static_sort_sig = [
+            [s.get("field", "id"), "DESC" if s.get("desc", False) else "ASC"]
+            for s in sorts
+            if s.get("field", "id") and (sortable_fields is None or s.get("field", "id") in sortable_fields)
+        ]
     
     return {
-        "data": [dict(r) for r in results],
-        "total": total,
-        "limit": effective_limit,
-        "offset": final_offset,
-        "view_name": view.name,
-        "view_version": view.version,
+        "projection": projection,
+        "filters": filters,
+        "sorts": sorts,
+        "params_schema": params_schema,
+        "select_clause": select_clause,
+        "filter_field_tokens": [f'"{f["field"]}"' for f in filters],
+        "static_sort_sig": static_sort_sig,
+        "sortable_fields": sortable_fields,
+        "limit_param": limit_param,
+        "offset_param": offset_param,
+        "fast_path": projection == ["*"] and not view.filters_json and not view.sorts_json,
     }
 
 
-def _build_filter_clause(field: str, operator: str, value: Any, param_name: str, bind_params: dict) -> str | None:
-    """Build a SQL WHERE clause for a filter."""
-    quoted_field = f'"{field}"'
-    
-    if operator == "=":
-        bind_params[param_name] = value
-        return f'{quoted_field} = :{param_name}'
-    elif operator == "!=":
-        bind_params[param_name] = value
-        return f'{quoted_field} != :{param_name}'
-    elif operator == ">":
-        bind_params[param_name] = value
-        return f'{quoted_field} > :{param_name}'
-    elif operator == "<":
-        bind_params[param_name] = value
-        return f'{quoted_field} < :{param_name}'
-    elif operator == ">=":
-        bind_params[param_name] = value
-        return f'{quoted_field} >= :{param_name}'
-    elif operator == "<=":
-        bind_params[param_name] = value
-        return f'{quoted_field} <= :{param_name}'
-    elif operator == "in":
-        if not isinstance(value, list):
-            value = [value]
-        placeholders = ", ".join([f":{param_name}_{i}" for i in range(len(value))])
-        for i, v in enumerate(value):
-            bind_params[f"{param_name}_{i}"] = v
-        return f'{quoted_field} IN ({placeholders})'
-    elif operator == "not_in":
-        if not isinstance(value, list):
-            value = [value]
-        placeholders = ", ".join([f":{param_name}_{i}" for i in range(len(value))])
-        for i, v in enumerate(value):
-            bind_params[f"{param_name}_{i}"] = v
-        return f'{quoted_field} NOT IN ({placeholders})'
-    elif operator == "contains":
-        bind_params[param_name] = f"%{value}%"
-        return f'{quoted_field} LIKE :{param_name}'
-    elif operator == "starts_with":
-        bind_params[param_name] = f"{value}%"
-        return f'{quoted_field} LIKE :{param_name}'
-    elif operator == "ends_with":
-        bind_params[param_name] = f"%{value}"
+def _get_view_plan(view: View) -> dict[str, Any]:
+    """Get the parsed execution plan for the current version of a view."""
+    key = (view.id, view.version)
+    plan = _view_plan_cache.get(key)
+    if plan is None:
+        plan = json.loads(view.compiled_plan_json) if view.compiled_plan_json else None
+        if plan is None or "filter_field_tokens" not in plan:
+            # Views created before plans were persisted, or persisted by an older format
+            plan = _compile_view_plan(view)
+        if plan["static_sort_sig"] is not None:
+            plan["static_sort_sig"] = tuple(map(tuple, plan["static_sort_sig"]))
+        plan["bound_filters"] = [
+            (
+                plan["filter_field_tokens"][i],
+                f["operator"],
+                f"p{i}",
+                _FILTER_BINDERS.get(f["operator"]),
+                bool(f.get("is_param")),
+                f.get("param_name", f["field"]),
+                f.get("value"),
+            )
+            for i, f in enumerate(plan["filters"])
+        ]
+        if len(_view_plan_cache) >= VIEW_PLAN_CACHE_SIZE:
+            _view_plan_cache.pop(next(iter(_view_plan_cache)))
+        _view_plan_cache[key] = plan
+    return plan
+
+
+@lru_cache(maxsize=1024)
+def _build_view_sql(
+    view_id: str,
+    version: int,
+    windowed_total: bool,
+    table_name: str,
+    select_clause: str,
+    filter_sig: tuple[tuple[str, str, int], ...],
+    sort_sig: tuple[tuple[str, str], ...],
+) -> tuple[TextClause, TextClause]:
+    """
+    Build the count and data statements for a view.
+    Cached per view version and query shape; bind values never enter the key.
+    With windowed_total the data statement also carries the total row count
+    as a window column so a page needs a single round-trip (used on Postgres).
+    """
+    where_clauses = []
+    for i, (field_token, operator, n_values) in enumerate(filter_sig):
+        clause = _build_filter_clause(field_token, operator, f"p{i}", n_values)
+        if clause:
+            where_clauses.append(clause)
+    
+    where_sql = " AND ".join(where_clauses) if where_clauses else "1=1"
+    order_sql = ", ".join(f'"{field}" {direction}' for field, direction in sort_sig) if sort_sig else "id ASC"
+    
+    if windowed_total:
+        select_clause = f"{select_clause}, COUNT(*) OVER () AS {TOTAL_COUNT_COLUMN}"
+    
+    count_sql = text(f'SELECT COUNT(*) FROM {table_name} WHERE {where_sql}')
+    query_sql = text(
+        f'SELECT {select_clause} FROM {table_name} WHERE {where_sql} '
+        f'ORDER BY {order_sql} LIMIT :limit OFFSET :offset'
+    )
+    return count_sql, query_sql
+
+
+@lru_cache(maxsize=1024)
+def _build_fast_view_sql(windowed_total: bool, table_name: str) -> tuple[TextClause, TextClause]:
+    """Build the statements for an unfiltered, unsorted SELECT * view."""
+    select_clause = f"*, COUNT(*) OVER () AS {TOTAL_COUNT_COLUMN}" if windowed_total else "*"
+    count_sql = text(f'SELECT COUNT(*) FROM {table_name}')
+    query_sql = text(
+        f'SELECT {select_clause} FROM {table_name} ORDER BY id ASC LIMIT :limit OFFSET :offset'
+    )
+    return count_sql, query_sql
+
+
+def _build_filter_clause(quoted_field: str, operator: str, param_name: str, n_values: int = 0) -> str | None:
+    """Build a SQL WHERE clause template for a filter on an already quoted column."""
+    if operator in ("=", "!=", ">", "<", ">=", "<="):
+        return f'{quoted_field} {operator} :{param_name}'
+    elif operator in ("in", "not_in"):
+        placeholders = ", ".join([f":{param_name}_{i}" for i in range(n_values)])
+        sql_operator = "IN" if operator == "in" else "NOT IN"
+        return f'{quoted_field} {sql_operator} ({placeholders})'
+    elif operator in ("contains", "starts_with", "ends_with"):
         return f'{quoted_field} LIKE :{param_name}'
     elif operator == "is_null":
         return f'{quoted_field} IS NULL'
@@ -378,6 +563,52 @@ def _build_filter_clause(field: str, operator: str, value: Any, param_name: str,
     return None
 
 
+# Filter binders populate bind parameters for a clause built by _build_filter_clause
+# and return the number of list values bound, which is part of the SQL shape.
+
+def _bind_value(value: Any, param_name: str, bind_params: dict) -> int:
+    bind_params[param_name] = value
+    return 0
+
+
+def _bind_list(value: Any, param_name: str, bind_params: dict) -> int:
+    if not isinstance(value, list):
+        value = [value]
+    for i, v in enumerate(value):
+        bind_params[f"{param_name}_{i}"] = v
+    return len(value)
+
+
+def _bind_contains(value: Any, param_name: str, bind_params: dict) -> int:
+    bind_params[param_name] = f"%{value}%"
+    return 0
+
+
+def _bind_starts_with(value: Any, param_name: str, bind_params: dict) -> int:
+    bind_params[param_name] = f"{value}%"
+    return 0
+
+
+def _bind_ends_with(value: Any, param_name: str, bind_params: dict) -> int:
+    bind_params[param_name] = f"%{value}"
+    return 0
+
+
+_FILTER_BINDERS = {
+    "=": _bind_value,
+    "!=": _bind_value,
+    ">": _bind_value,
+    "<": _bind_value,
+    ">=": _bind_value,
+    "<=": _bind_value,
+    "in": _bind_list,
+    "not_in": _bind_list,
+    "contains": _bind_contains,
+    "starts_with": _bind_starts_with,
+    "ends_with": _bind_ends_with,
+}
+
+
 def get_available_operators() -> list[dict]:
     """Get list of available filter operators."""
     return [
@@ -3,19 +3,18 @@ import hmac
 import json
 import secrets
 from datetime import datetime
-from typing import Any
 
-import httpx
+import orjson
 from sqlalchemy.orm import Session
 
-from app.models.webhook import Webhook, WebhookDelivery
+from app.core.http_client import get_http_client
+from app.db.cache import ModelCache
+from app.models.webhook import Webhook, WebhookDelivery, WebhookEvent
 
 
-def _json_serializer(obj: Any) -> str:
-    """Custom JSON serializer for objects not serializable by default json code."""
-    if isinstance(obj, datetime):
-        return obj.isoformat()
-    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+# Webhooks keyed by (project_id, webhook_id); invalidated on every write.
+# Only read-only lookups go through it; writers load the current row.
+_webhook_cache = ModelCache(ttl_seconds=5.0)
 
 
 def generate_secret() -> str:
@@ -26,8 +25,11 @@ def hash_secret(secret: str) -> str:
     return hashlib.sha256(secret.encode()).hexdigest()
 
 
-def sign_payload(payload: str, secret: str) -> str:
-    return hmac.new(secret.encode(), payload.encode(), hashlib.sha256).hexdigest()
+def sign_payload(payload: str | bytes, secret: str) -> str:
+    if isinstance(payload, str):
+        payload = payload.encode()
+    # One-shot C implementation; avoids building an HMAC object per delivery
+    return hmac.digest(secret.encode(), payload, "sha256").hex()
 
 
 def create_webhook(
@@ -47,8 +49,14 @@ def create_webhook(
         is_active=True,
     )
     db.add(webhook)
+    db.flush()
+    db.add_all([
+        WebhookEvent(webhook_id=webhook.id, project_id=project_id, event_type=event_type)
+        for event_type in webhook.events_set
+    ])
     db.commit()
     db.refresh(webhook)
+    _webhook_cache.invalidate((project_id, webhook.id))
     return webhook, secret
 
 
@@ -57,6 +65,19 @@ def list_webhooks(db: Session, project_id: str) -> list[Webhook]:
 
 
 def get_webhook(db: Session, project_id: str, webhook_id: str) -> Webhook | None:
+    """Get a webhook for reading; may be up to the cache TTL stale across processes."""
+    key = (project_id, webhook_id)
+    webhook = _webhook_cache.get(db, key)
+    if webhook is not None:
+        return webhook
+    
+    webhook = _load_webhook(db, project_id, webhook_id)
+    if webhook is not None:
+        _webhook_cache.put(key, webhook)
+    return webhook
+
+
+def _load_webhook(db: Session, project_id: str, webhook_id: str) -> Webhook | None:
     return db.query(Webhook).filter(
         Webhook.id == webhook_id,
         Webhook.project_id == project_id,
@@ -64,45 +85,25 @@ def get_webhook(db: Session, project_id: str, webhook_id: str) -> Webhook | None
 
 
 def delete_webhook(db: Session, project_id: str, webhook_id: str) -> bool:
-    webhook = get_webhook(db, project_id, webhook_id)
+    # Not the cached snapshot: another process may already have deleted the row
+    webhook = _load_webhook(db, project_id, webhook_id)
     if not webhook:
         return False
+    db.query(WebhookEvent).filter(WebhookEvent.webhook_id == webhook.id).delete()
     db.delete(webhook)
     db.commit()
+    _webhook_cache.invalidate((project_id, webhook_id))
     return True
 
 
 def get_webhooks_for_event(db: Session, project_id: str, event_type: str) -> list[Webhook]:
-    webhooks = db.query(Webhook).filter(
-        Webhook.project_id == project_id,
+    return db.query(Webhook).join(
+        WebhookEvent, WebhookEvent.webhook_id == Webhook.id,
+    ).filter(
+        WebhookEvent.project_id == project_id,
+        WebhookEvent.event_type.in_([event_type, "*"]),
         Webhook.is_active == True,
-    ).all()
-    
-    result = []
-    for webhook in webhooks:
-        events = json.loads(webhook.events)
-        if event_type in events or "*" in events:
-            result.append(webhook)
-    return result
-
-
-def create_delivery(
-    db: Session,
-    webhook_id: str,
-    event_type: str,
-    payload: dict,
-) -> WebhookDelivery:
-    delivery = WebhookDelivery(
-        webhook_id=webhook_id,
-        event_type=event_type,
-        payload_json=json.dumps(payload, default=_json_serializer),
-        status="pending",
-        attempts=0,
-    )
-    db.add(delivery)
-    db.commit()
-    db.refresh(delivery)
-    return delivery
+    ).distinct().all()
 
 
 async def deliver_webhook(
@@ -111,7 +112,8 @@ async def deliver_webhook(
     webhook: Webhook,
     secret: str | None = None,
 ) -> bool:
-    payload = delivery.payload_json
+    # Encode once; the same bytes are signed and sent
+    payload = delivery.payload_json.encode()
     headers = {
         "Content-Type": "application/json",
         "X-Webhook-Event": delivery.event_type,
@@ -125,20 +127,22 @@ async def deliver_webhook(
     delivery.attempts += 1
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(webhook.url, content=payload, headers=headers)
-            delivery.response_status = response.status_code
-            delivery.response_body = response.text[:4096] if response.text else None
-            
-            if 200 <= response.status_code < 300:
-                delivery.status = "delivered"
-                delivery.delivered_at = datetime.utcnow()
-                db.commit()
-                return True
-            else:
-                delivery.status = "failed"
-                db.commit()
-                return False
+        client = await get_http_client()
+        response = await client.post(webhook.url, content=payload, headers=headers)
+        delivery.response_status = response.status_code
+        # Decode only the stored prefix rather than the whole response body
+        body = response.content[:4096]
+        delivery.response_body = body.decode(response.encoding or "utf-8", errors="replace") if body else None
+        
+        if 200 <= response.status_code < 300:
+            delivery.status = "delivered"
+            delivery.delivered_at = datetime.utcnow()
+            db.commit()
+            return True
+        else:
+            delivery.status = "failed"
+            db.commit()
+            return False
     except Exception as e:
         delivery.error = str(e)[:1024]
         delivery.status = "failed"
@@ -148,12 +152,24 @@ async def deliver_webhook(
 
 def emit_event(db: Session, project_id: str, event_type: str, payload: dict) -> list[WebhookDelivery]:
     webhooks = get_webhooks_for_event(db, project_id, event_type)
-    deliveries = []
-    
-    for webhook in webhooks:
-        delivery = create_delivery(db, webhook.id, event_type, payload)
-        deliveries.append(delivery)
+    if not webhooks:
+        return []
     
+    # Every subscriber receives the same body, so serialize it once
+    payload_json = orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS).decode()
+    deliveries = [
+        WebhookDelivery(
+            webhook_id=webhook.id,
+            event_type=event_type,
+            payload_json=payload_json,
+            status="pending",
+            attempts=0,
+        )
+        for webhook in webhooks
+    ]
+    # Flushed only; the caller commits together with the record change
+    db.add_all(deliveries)
+    db.flush()
     return deliveries
 
 
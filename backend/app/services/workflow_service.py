@@ -1,12 +1,22 @@
+import asyncio
 import json
 from datetime import datetime
 
-import httpx
+import orjson
 from sqlalchemy.orm import Session
 
+from app.core.http_client import get_http_client
 from app.models.workflow import Workflow, WorkflowRun, WorkflowStep
 
 
+def _dumps(value) -> str:
+    try:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+    except orjson.JSONEncodeError:
+        # orjson rejects ints wider than 64 bits, which json has always accepted
+        return json.dumps(value)
+
+
 def create_workflow(
     db: Session,
     project_id: str,
@@ -54,47 +64,85 @@ def delete_workflow(db: Session, project_id: str, workflow_id: str) -> bool:
 def trigger_workflow(db: Session, workflow: Workflow, trigger_data: dict) -> WorkflowRun:
     run = WorkflowRun(
         workflow_id=workflow.id,
-        trigger_data_json=json.dumps(trigger_data),
+        trigger_data_json=_dumps(trigger_data),
         status="running",
         started_at=datetime.utcnow(),
     )
     db.add(run)
-    db.commit()
-    db.refresh(run)
+    # id is generated client-side and created_at comes back via eager_defaults,
+    # so a flush is enough; execute_workflow_run commits the run
+    db.flush()
     return run
 
 
+def _layer_steps(steps: list[dict]) -> list[list[int]]:
+    """
+    Group step indices into layers that can run concurrently.
+    A step runs after the steps listed in its depends_on; without it a step
+    depends on the previous one, so legacy workflows stay sequential.
+    """
+    levels: list[int] = []
+    for i, step_config in enumerate(steps):
+        depends_on = step_config.get("depends_on", [i - 1] if i > 0 else [])
+        for dep in depends_on:
+            if not isinstance(dep, int) or not 0 <= dep < i:
+                raise ValueError(f"Step {i} can only depend on earlier steps, got {dep!r}")
+        levels.append(max((levels[dep] for dep in depends_on), default=-1) + 1)
+    
+    layers: list[list[int]] = [[] for _ in range(max(levels, default=-1) + 1)]
+    for i, level in enumerate(levels):
+        layers[level].append(i)
+    return layers
+
+
 async def execute_workflow_run(db: Session, run: WorkflowRun, workflow: Workflow) -> bool:
     steps = json.loads(workflow.steps_json)
     context = {"trigger": json.loads(run.trigger_data_json)}
     
+    # Step rows are created up front and only flushed between layers;
+    # the run is committed once when it completes or fails.
+    step_rows = [
+        WorkflowStep(
+            run_id=run.id,
+            step_index=i,
+            action_type=step_config.get("action", "unknown"),
+            input_json=_dumps(step_config),
+            status="pending",
+        )
+        for i, step_config in enumerate(steps)
+    ]
+    db.add_all(step_rows)
+    db.flush()
+    
     try:
-        for i, step_config in enumerate(steps):
-            step = WorkflowStep(
-                run_id=run.id,
-                step_index=i,
-                action_type=step_config.get("action", "unknown"),
-                input_json=json.dumps(step_config),
-                status="running",
-                started_at=datetime.utcnow(),
+        for layer in _layer_steps(steps):
+            for i in layer:
+                step_rows[i].status = "running"
+                step_rows[i].started_at = datetime.utcnow()
+            db.flush()
+            
+            # Steps in a layer do not depend on each other, so they run concurrently
+            results = await asyncio.gather(
+                *(execute_step(steps[i], context) for i in layer),
+                return_exceptions=True,
             )
-            db.add(step)
-            db.commit()
             
-            try:
-                result = await execute_step(step_config, context)
-                step.output_json = json.dumps(result)
-                step.status = "completed"
+            failure = None
+            for i, result in zip(layer, results):
+                step = step_rows[i]
                 step.completed_at = datetime.utcnow()
-                context[f"step_{i}"] = result
-            except Exception as e:
-                step.error = str(e)
-                step.status = "failed"
-                step.completed_at = datetime.utcnow()
-                db.commit()
-                raise
+                if isinstance(result, BaseException):
+                    step.error = str(result)
+                    step.status = "failed"
+                    failure = failure or result
+                else:
+                    step.output_json = _dumps(result)
+                    step.status = "completed"
+                    context[f"step_{i}"] = result
             
-            db.commit()
+            db.flush()
+            if failure is not None:
+                raise failure
         
         run.status = "completed"
         run.completed_at = datetime.utcnow()
@@ -102,6 +150,10 @@ async def execute_workflow_run(db: Session, run: WorkflowRun, workflow: Workflow
         return True
         
     except Exception as e:
+        # Steps in layers after the failure never ran
+        for step in step_rows:
+            if step.status == "pending":
+                step.status = "skipped"
         run.status = "failed"
         run.error = str(e)
         run.completed_at = datetime.utcnow()
@@ -111,18 +163,10 @@ async def execute_workflow_run(db: Session, run: WorkflowRun, workflow: Workflow
 
 async def execute_step(step_config: dict, context: dict) -> dict:
     action = step_config.get("action")
-    
-    if action == "http_request":
-        return await execute_http_request(step_config, context)
-    elif action == "delay":
-        import asyncio
-        delay_seconds = step_config.get("seconds", 1)
-        await asyncio.sleep(min(delay_seconds, 60))
-        return {"delayed": delay_seconds}
-    elif action == "transform":
-        return execute_transform(step_config, context)
-    else:
+    handler = _STEP_HANDLERS.get(action)
+    if handler is None:
         return {"action": action, "status": "no_op"}
+    return await handler(step_config, context)
 
 
 async def execute_http_request(step_config: dict, context: dict) -> dict:
@@ -131,23 +175,32 @@ async def execute_http_request(step_config: dict, context: dict) -> dict:
     headers = step_config.get("headers", {})
     body = step_config.get("body")
     
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        if method == "GET":
-            response = await client.get(url, headers=headers)
-        elif method == "POST":
-            response = await client.post(url, headers=headers, json=body)
-        elif method == "PUT":
-            response = await client.put(url, headers=headers, json=body)
-        elif method == "DELETE":
-            response = await client.delete(url, headers=headers)
-        else:
-            response = await client.request(method, url, headers=headers, json=body)
-        
-        return {
-            "status_code": response.status_code,
-            "body": response.text[:4096] if response.text else None,
-        }
+    client = await get_http_client()
+    response = await client.request(
+        method,
+        url,
+        headers=headers,
+        json=body if method not in ("GET", "DELETE") else None,
+    )
+    
+    return {
+        "status_code": response.status_code,
+        "body": response.text[:4096] if response.text else None,
+    }
 
 
-def execute_transform(step_config: dict, context: dict) -> dict:
+async def execute_delay(step_config: dict, context: dict) -> dict:
+    delay_seconds = step_config.get("seconds", 1)
+    await asyncio.sleep(min(delay_seconds, 60))
+    return {"delayed": delay_seconds}
+
+
+async def execute_transform(step_config: dict, context: dict) -> dict:
     return {"transformed": True, "input_keys": list(context.keys())}
+
+
+_STEP_HANDLERS = {
+    "http_request": execute_http_request,
+    "delay": execute_delay,
+    "transform": execute_transform,
+}
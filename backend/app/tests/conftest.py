@@ -1,52 +1,178 @@
+import orjson
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from app.api import deps
+from app.core.config import settings
 from app.db.base import Base
 from app.main import app
 from app.core.rate_limit import rate_limiter
 
 SQLALCHEMY_DATABASE_URL = "sqlite+pysqlite:///:memory:"
 
+# One shared in-memory database; every test runs inside a SAVEPOINT on it
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}, future=True
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+    future=True,
 )
+
+
+@event.listens_for(engine, "connect")
+def _configure_sqlite_connection(dbapi_connection, connection_record):
+    # pysqlite defers BEGIN on its own, which breaks SAVEPOINT; let SQLAlchemy emit it
+    dbapi_connection.isolation_level = None
+    # The database is thrown away after the run, so durability is not needed
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA locking_mode=EXCLUSIVE")
+    cursor.close()
+
+
+@event.listens_for(engine, "begin")
+def _begin_sqlite_transaction(conn):
+    conn.exec_driver_sql("BEGIN")
+
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, future=True)
 
 
+@pytest.fixture(scope="session", autouse=True)
+def fast_password_hash():
+    # Minimum bcrypt cost: hashes stay real, but register/login no longer dominate the run
+    patch = pytest.MonkeyPatch()
+    patch.setattr(settings, "BCRYPT_ROUNDS", 4)
+    yield
+    patch.undo()
+
+
 @pytest.fixture(scope="session", autouse=True)
 def prepare_database():
     # Disable rate limiting for tests
     rate_limiter.disable()
+    # No drop_all on teardown: the in-memory database goes away with the process
     Base.metadata.create_all(bind=engine)
-    yield
-    Base.metadata.drop_all(bind=engine)
 
 
-@pytest.fixture
-def db_session() -> Session:
-    connection = engine.connect()
+@pytest.fixture(scope="session")
+def db_connection(prepare_database):
+    # One connection and outer transaction for the whole run; tests only add SAVEPOINTs.
+    # All test traffic goes through it, so an unbounded statement cache never evicts.
+    connection = engine.connect().execution_options(compiled_cache={})
     transaction = connection.begin()
-    session = TestingSessionLocal(bind=connection)
+    yield connection
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture
+def db_session(db_connection) -> Session:
+    savepoint = db_connection.begin_nested()
+    # Session commits and rollbacks only release or roll back an inner SAVEPOINT
+    session = TestingSessionLocal(bind=db_connection, join_transaction_mode="create_savepoint")
     try:
         yield session
     finally:
         session.close()
-        transaction.rollback()
-        connection.close()
+        savepoint.rollback()
 
 
-@pytest.fixture
-def client(db_session: Session):
+def ok(res, status_code: int = 200):
+    """Assert the response status, then decode its JSON body."""
+    assert res.status_code == status_code, res.text
+    return orjson.loads(res.content)
+
+
+def _use_test_session(session: Session):
+    """Route get_db to session; returns the override it replaces."""
     def _get_test_db():
         try:
-            yield db_session
+            yield session
         finally:
             pass
 
+    previous = app.dependency_overrides.get(deps.get_db)
     app.dependency_overrides[deps.get_db] = _get_test_db
+    return previous
+
+
+def _restore_get_db(previous) -> None:
+    # Hand get_db back to the enclosing module or class session, if there is one,
+    # so module fixtures first requested by a later test still write to theirs
+    if previous is None:
+        app.dependency_overrides.pop(deps.get_db, None)
+    else:
+        app.dependency_overrides[deps.get_db] = previous
+
+
+@pytest.fixture(scope="session")
+def client_session():
+    # App startup/shutdown runs once; tests only swap the get_db override
     with TestClient(app) as c:
         yield c
-    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def client(client_session: TestClient, db_session: Session):
+    client_session.cookies.clear()
+    previous = _use_test_session(db_session)
+    yield client_session
+    _restore_get_db(previous)
+
+
+@pytest.fixture(scope="session")
+def admin_token(client_session: TestClient, db_connection) -> str:
+    """
+    Access token of one admin registered for the whole run. The user is written
+    to the outer transaction, so tests must not modify it.
+    """
+    session = TestingSessionLocal(bind=db_connection, join_transaction_mode="create_savepoint")
+    previous = _use_test_session(session)
+    res = client_session.post("/api/auth/register", json={"email": "admin@example.com", "password": "password123"})
+    _restore_get_db(previous)
+    session.close()
+    client_session.cookies.clear()
+    return ok(res, 201)["access_token"]
+
+
+def _savepoint_client(client_session: TestClient, db_connection):
+    savepoint = db_connection.begin_nested()
+    session = TestingSessionLocal(bind=db_connection, join_transaction_mode="create_savepoint")
+    previous = _use_test_session(session)
+    yield client_session
+    _restore_get_db(previous)
+    session.close()
+    savepoint.rollback()
+
+
+@pytest.fixture(scope="module")
+def client_module(client_session: TestClient, db_connection, admin_token):
+    """
+    Client for module-level setup. Its writes sit in a module SAVEPOINT that
+    every test SAVEPOINT nests inside, and are rolled back after the module.
+    """
+    # admin_token is requested so it is never first written inside this SAVEPOINT
+    yield from _savepoint_client(client_session, db_connection)
+
+
+@pytest.fixture(scope="class")
+def client_class(client_session: TestClient, db_connection, admin_token):
+    """Like client_module, for setup shared by the tests of one class."""
+    yield from _savepoint_client(client_session, db_connection)
+
+
+@pytest.fixture(scope="module")
+def admin_ctx(client_module: TestClient, admin_token: str):
+    """
+    (token, project_id, headers) shared by a module. On SQLite project tables
+    share one namespace, so a project cannot outlive the module that created it.
+    """
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    res = client_module.post("/api/projects", json={"name": "Shared Project"}, headers=headers)
+    return admin_token, ok(res, 201)["id"], headers
+
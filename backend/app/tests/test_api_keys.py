@@ -1,3 +1,4 @@
+from .conftest import ok
 from .test_auth import auth_headers
 
 
@@ -16,14 +17,12 @@ def test_create_list_revoke_api_keys(client):
         json={"name": "Primary"},
         headers=auth_headers(token),
     )
-    assert create_res.status_code == 201
-    created = create_res.json()
+    created = ok(create_res, 201)
     assert created["api_key"]
     assert created["prefix"] == created["api_key"][:8]
 
     list_res = client.get(f"/api/projects/{project_id}/api-keys", headers=auth_headers(token))
-    assert list_res.status_code == 200
-    keys = list_res.json()
+    keys = ok(list_res)
     assert len(keys) == 1
     assert "api_key" not in keys[0]
     assert keys[0]["revoked"] is False
@@ -1,3 +1,14 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.security import hash_token
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+from app.services.auth import issue_tokens, refresh_tokens
+
+
 def auth_headers(token: str):
     return {"Authorization": f"Bearer {token}"}
 
@@ -56,3 +67,38 @@ def test_register_duplicate_email(client):
 def test_me_without_auth(client):
     res = client.get("/api/me")
     assert res.status_code == 401
+
+
+def make_user(db_session, email: str) -> User:
+    """Insert a user directly; the token service never checks the password."""
+    user = User(email=email, password_hash="unused")
+    db_session.add(user)
+    db_session.flush()
+    return user
+
+
+def test_refresh_tokens_rotates_and_revokes_old(db_session):
+    user = make_user(db_session, "rotate@example.com")
+    _, old_refresh = issue_tokens(db_session, user)
+
+    rotated_user, _, new_refresh = refresh_tokens(db_session, old_refresh)
+    assert rotated_user.id == user.id
+    assert new_refresh != old_refresh
+
+    with pytest.raises(HTTPException) as exc:
+        refresh_tokens(db_session, old_refresh)
+    assert exc.value.status_code == 401
+
+    refresh_tokens(db_session, new_refresh)
+
+
+def test_refresh_tokens_rejects_expired(db_session):
+    user = make_user(db_session, "expired@example.com")
+    _, refresh = issue_tokens(db_session, user)
+    db_token = db_session.query(RefreshToken).filter(RefreshToken.token_hash == hash_token(refresh)).one()
+    db_token.expires_at = datetime.now(tz=timezone.utc) - timedelta(seconds=1)
+    db_session.commit()
+
+    with pytest.raises(HTTPException) as exc:
+        refresh_tokens(db_session, refresh)
+    assert exc.value.detail == "Refresh token expired"
@@ -1,20 +1,14 @@
-def auth_headers(token: str) -> dict:
-    return {"Authorization": f"Bearer {token}"}
+import pytest
 
+from .conftest import ok
 
-def bootstrap_project(client):
-    res = client.post("/api/auth/register", json={"email": "coll@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    project = client.post("/api/projects", json={"name": "Test Project"}, headers=auth_headers(token)).json()
-    return token, project["id"]
 
-
-def test_create_collection(client):
-    token, project_id = bootstrap_project(client)
+def test_create_collection(client, admin_ctx):
+    _, project_id, headers = admin_ctx
     res = client.post(
         f"/api/projects/{project_id}/schema/collections",
         json={"name": "posts", "display_name": "Blog Posts"},
-        headers=auth_headers(token),
+        headers=headers,
     )
     assert res.status_code == 201
     data = res.json()
@@ -24,19 +18,19 @@ def test_create_collection(client):
     assert data["is_active"] is True
 
 
-def test_list_collections(client):
-    token, project_id = bootstrap_project(client)
+def test_list_collections(client, admin_ctx):
+    _, project_id, headers = admin_ctx
     client.post(
         f"/api/projects/{project_id}/schema/collections",
         json={"name": "posts", "display_name": "Posts"},
-        headers=auth_headers(token),
+        headers=headers,
     )
     client.post(
         f"/api/projects/{project_id}/schema/collections",
         json={"name": "comments", "display_name": "Comments"},
-        headers=auth_headers(token),
+        headers=headers,
     )
-    res = client.get(f"/api/projects/{project_id}/schema/collections", headers=auth_headers(token))
+    res = client.get(f"/api/projects/{project_id}/schema/collections", headers=headers)
     assert res.status_code == 200
     data = res.json()
     # 3 collections: _users (auto-created) + posts + comments
@@ -45,49 +39,34 @@ def test_list_collections(client):
     assert names == {"_users", "posts", "comments"}
 
 
-def test_get_collection(client):
-    token, project_id = bootstrap_project(client)
+def test_get_collection(client, admin_ctx):
+    _, project_id, headers = admin_ctx
     client.post(
         f"/api/projects/{project_id}/schema/collections",
         json={"name": "products", "display_name": "Products"},
-        headers=auth_headers(token),
+        headers=headers,
     )
-    res = client.get(f"/api/projects/{project_id}/schema/collections/products", headers=auth_headers(token))
+    res = client.get(f"/api/projects/{project_id}/schema/collections/products", headers=headers)
     assert res.status_code == 200
     assert res.json()["name"] == "products"
 
 
-def test_create_collection_invalid_name(client):
-    token, project_id = bootstrap_project(client)
+def test_create_collection_invalid_name(client, admin_ctx):
+    _, project_id, headers = admin_ctx
     res = client.post(
         f"/api/projects/{project_id}/schema/collections",
         json={"name": "Invalid Name", "display_name": "Invalid"},
-        headers=auth_headers(token),
+        headers=headers,
     )
     assert res.status_code == 422
 
 
-def test_create_duplicate_collection(client):
-    token, project_id = bootstrap_project(client)
-    client.post(
-        f"/api/projects/{project_id}/schema/collections",
-        json={"name": "orders", "display_name": "Orders"},
-        headers=auth_headers(token),
-    )
-    res = client.post(
-        f"/api/projects/{project_id}/schema/collections",
-        json={"name": "orders", "display_name": "Orders Again"},
-        headers=auth_headers(token),
-    )
-    assert res.status_code == 409
-
-
-def test_add_field_to_collection(client):
-    token, project_id = bootstrap_project(client)
+def test_add_field_to_collection(client, admin_ctx):
+    _, project_id, headers = admin_ctx
     client.post(
         f"/api/projects/{project_id}/schema/collections",
         json={"name": "articles", "display_name": "Articles"},
-        headers=auth_headers(token),
+        headers=headers,
     )
     res = client.post(
         f"/api/projects/{project_id}/schema/collections/articles/fields",
@@ -97,7 +76,7 @@ def test_add_field_to_collection(client):
             "field_type": "string",
             "is_required": False,
         },
-        headers=auth_headers(token),
+        headers=headers,
     )
     assert res.status_code == 201
     data = res.json()
@@ -106,72 +85,80 @@ def test_add_field_to_collection(client):
     assert data["sql_column_name"] == "title"
 
 
-def test_list_fields(client):
-    token, project_id = bootstrap_project(client)
+def test_list_fields(client, admin_ctx):
+    _, project_id, headers = admin_ctx
     client.post(
         f"/api/projects/{project_id}/schema/collections",
         json={"name": "items", "display_name": "Items"},
-        headers=auth_headers(token),
+        headers=headers,
     )
     client.post(
         f"/api/projects/{project_id}/schema/collections/items/fields",
         json={"name": "name", "display_name": "Name", "field_type": "string"},
-        headers=auth_headers(token),
+        headers=headers,
     )
     client.post(
         f"/api/projects/{project_id}/schema/collections/items/fields",
         json={"name": "price", "display_name": "Price", "field_type": "float"},
-        headers=auth_headers(token),
+        headers=headers,
     )
-    res = client.get(f"/api/projects/{project_id}/schema/collections/items/fields", headers=auth_headers(token))
+    res = client.get(f"/api/projects/{project_id}/schema/collections/items/fields", headers=headers)
     assert res.status_code == 200
     data = res.json()
     assert len(data) == 2
 
 
-def test_add_field_invalid_type(client):
-    token, project_id = bootstrap_project(client)
+def test_add_field_invalid_type(client, admin_ctx):
+    _, project_id, headers = admin_ctx
     client.post(
         f"/api/projects/{project_id}/schema/collections",
         json={"name": "test", "display_name": "Test"},
-        headers=auth_headers(token),
+        headers=headers,
     )
     res = client.post(
         f"/api/projects/{project_id}/schema/collections/test/fields",
         json={"name": "bad", "display_name": "Bad", "field_type": "invalid_type"},
-        headers=auth_headers(token),
+        headers=headers,
     )
     assert res.status_code == 400
 
 
-def test_add_duplicate_field(client):
-    token, project_id = bootstrap_project(client)
-    client.post(
-        f"/api/projects/{project_id}/schema/collections",
-        json={"name": "dupes", "display_name": "Dupes"},
-        headers=auth_headers(token),
-    )
-    client.post(
-        f"/api/projects/{project_id}/schema/collections/dupes/fields",
-        json={"name": "email", "display_name": "Email", "field_type": "string"},
-        headers=auth_headers(token),
-    )
-    res = client.post(
-        f"/api/projects/{project_id}/schema/collections/dupes/fields",
-        json={"name": "email", "display_name": "Email Again", "field_type": "string"},
-        headers=auth_headers(token),
-    )
-    assert res.status_code == 409
-
-
-def test_collection_not_found(client):
-    token, project_id = bootstrap_project(client)
-    res = client.get(f"/api/projects/{project_id}/schema/collections/nonexistent", headers=auth_headers(token))
+class TestDuplicates:
+    """Creating an existing collection or field is rejected."""
+    
+    @pytest.fixture(scope="class")
+    def orders(self, client_class, admin_ctx):
+        # Created once inside the class SAVEPOINT, so other tests never see it
+        _, project_id, headers = admin_ctx
+        ok(client_class.post(
+            f"/api/projects/{project_id}/schema/collections",
+            json={"name": "orders", "display_name": "Orders"},
+            headers=headers,
+        ), 201)
+        ok(client_class.post(
+            f"/api/projects/{project_id}/schema/collections/orders/fields",
+            json={"name": "email", "display_name": "Email", "field_type": "string"},
+            headers=headers,
+        ), 201)
+    
+    @pytest.mark.parametrize("path,payload", [
+        ("schema/collections", {"name": "orders", "display_name": "Orders Again"}),
+        ("schema/collections/orders/fields", {"name": "email", "display_name": "Email Again", "field_type": "string"}),
+    ])
+    def test_duplicate_rejected(self, client, admin_ctx, orders, path, payload):
+        _, project_id, headers = admin_ctx
+        res = client.post(f"/api/projects/{project_id}/{path}", json=payload, headers=headers)
+        assert res.status_code == 409
+
+
+def test_collection_not_found(client, admin_ctx):
+    _, project_id, headers = admin_ctx
+    res = client.get(f"/api/projects/{project_id}/schema/collections/nonexistent", headers=headers)
     assert res.status_code == 404
 
 
-def test_create_collection_without_auth(client):
-    token, project_id = bootstrap_project(client)
+def test_create_collection_without_auth(client, admin_ctx):
+    _, project_id, headers = admin_ctx
     res = client.post(
         f"/api/projects/{project_id}/schema/collections",
         json={"name": "noauth", "display_name": "No Auth"},
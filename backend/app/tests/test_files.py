@@ -1,157 +1,139 @@
 """Tests for File Storage (Milestone N)"""
-import io
-import pytest
-from .test_auth import auth_headers
+from app.models.file import StoredFile
+from app.services import file_service
 
+TXT = b"Hello, this is a test file!"
 
-def test_upload_file(client):
-    """Test uploading a file."""
-    res = client.post("/api/auth/register", json={"email": "file1@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "File Upload Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
-    
-    file_content = b"Hello, this is a test file!"
-    files = {"file": ("test.txt", io.BytesIO(file_content), "text/plain")}
-    data = {"bucket": "documents", "is_public": "false"}
-    
-    upload_res = client.post(
+
+def upload(client, project_id, headers, name="test.txt", body=TXT, content_type="text/plain", **data):
+    """POST one file; the body is passed as bytes, without a BytesIO wrapper."""
+    return client.post(
         f"/api/projects/{project_id}/files/upload",
-        files=files,
+        files={"file": (name, body, content_type)},
         data=data,
-        headers=auth_headers(token),
+        headers=headers,
     )
+
+
+def seed_files(db_session, project_id, specs):
+    """Insert file metadata rows in one flush; nothing is written to storage."""
+    db_session.add_all([
+        StoredFile(
+            project_id=project_id,
+            filename=spec["name"],
+            original_filename=spec["name"],
+            content_type=spec.get("content_type", "text/plain"),
+            size_bytes=0,
+            storage_path=f"{project_id}/{spec['name']}",
+            bucket=spec.get("bucket"),
+        )
+        for spec in specs
+    ])
+    db_session.flush()
+
+
+def test_upload_file(client, admin_ctx):
+    """Test uploading a file."""
+    _, project_id, headers = admin_ctx
+    
+    upload_res = upload(client, project_id, headers, bucket="documents", is_public="false")
     assert upload_res.status_code == 201
     result = upload_res.json()
     assert result["original_filename"] == "test.txt"
     assert result["content_type"] == "text/plain"
-    assert result["size_bytes"] == len(file_content)
+    assert result["size_bytes"] == len(TXT)
     assert result["bucket"] == "documents"
 
 
-def test_list_files(client):
-    """Test listing files."""
-    res = client.post("/api/auth/register", json={"email": "file2@example.com", "password": "password123"})
-    token = res.json()["access_token"]
+def test_upload_file_too_large(client, admin_ctx, monkeypatch):
+    """Test that an upload over the size limit is rejected while streaming."""
+    _, project_id, headers = admin_ctx
+    monkeypatch.setattr(file_service, "MAX_FILE_SIZE", len(TXT) - 1)
     
-    project_res = client.post("/api/projects", json={"name": "List Files Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
-    
-    files1 = {"file": ("file1.txt", io.BytesIO(b"content1"), "text/plain")}
-    client.post(f"/api/projects/{project_id}/files/upload", files=files1, headers=auth_headers(token))
-    
-    files2 = {"file": ("file2.txt", io.BytesIO(b"content2"), "text/plain")}
-    client.post(f"/api/projects/{project_id}/files/upload", files=files2, headers=auth_headers(token))
+    upload_res = upload(client, project_id, headers, name="toolarge.txt")
+    assert upload_res.status_code == 400
+
+
+def test_list_files(client, db_session, admin_ctx):
+    """Test listing files."""
+    _, project_id, headers = admin_ctx
+    seed_files(db_session, project_id, [{"name": "file1.txt"}, {"name": "file2.txt"}])
     
-    list_res = client.get(f"/api/projects/{project_id}/files", headers=auth_headers(token))
+    list_res = client.get(f"/api/projects/{project_id}/files", headers=headers)
     assert list_res.status_code == 200
     files = list_res.json()
     assert len(files) >= 2
 
 
-def test_get_file_metadata(client):
+def test_get_file_metadata(client, admin_ctx):
     """Test getting file metadata."""
-    res = client.post("/api/auth/register", json={"email": "file3@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Get File Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
+    _, project_id, headers = admin_ctx
     
-    files = {"file": ("metadata.txt", io.BytesIO(b"metadata content"), "text/plain")}
-    upload_res = client.post(f"/api/projects/{project_id}/files/upload", files=files, headers=auth_headers(token))
+    upload_res = upload(client, project_id, headers, name="metadata.txt")
     file_id = upload_res.json()["id"]
     
-    get_res = client.get(f"/api/projects/{project_id}/files/{file_id}", headers=auth_headers(token))
+    get_res = client.get(f"/api/projects/{project_id}/files/{file_id}", headers=headers)
     assert get_res.status_code == 200
     data = get_res.json()
     assert data["original_filename"] == "metadata.txt"
     assert "download_url" in data
 
 
-def test_download_file(client):
+def test_download_file(client, admin_ctx):
     """Test downloading a public file."""
-    res = client.post("/api/auth/register", json={"email": "file4@example.com", "password": "password123"})
-    token = res.json()["access_token"]
+    _, project_id, headers = admin_ctx
     
-    project_res = client.post("/api/projects", json={"name": "Download Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
-    
-    original_content = b"Download this content!"
-    files = {"file": ("download.txt", io.BytesIO(original_content), "text/plain")}
-    data = {"is_public": "true"}
-    upload_res = client.post(f"/api/projects/{project_id}/files/upload", files=files, data=data, headers=auth_headers(token))
+    upload_res = upload(client, project_id, headers, name="download.txt", is_public="true")
     file_id = upload_res.json()["id"]
     
     download_res = client.get(f"/api/projects/{project_id}/files/{file_id}/download")
     assert download_res.status_code == 200
-    assert download_res.content == original_content
+    assert download_res.content == TXT
 
 
-def test_delete_file(client):
+def test_delete_file(client, db_session, admin_ctx):
     """Test deleting a file."""
-    res = client.post("/api/auth/register", json={"email": "file5@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Delete File Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
+    _, project_id, headers = admin_ctx
     
-    files = {"file": ("todelete.txt", io.BytesIO(b"delete me"), "text/plain")}
-    upload_res = client.post(f"/api/projects/{project_id}/files/upload", files=files, headers=auth_headers(token))
+    upload_res = upload(client, project_id, headers, name="todelete.txt")
     file_id = upload_res.json()["id"]
     
-    delete_res = client.delete(f"/api/projects/{project_id}/files/{file_id}", headers=auth_headers(token))
+    delete_res = client.delete(f"/api/projects/{project_id}/files/{file_id}", headers=headers)
     assert delete_res.status_code == 204
-    
-    get_res = client.get(f"/api/projects/{project_id}/files/{file_id}", headers=auth_headers(token))
-    assert get_res.status_code == 404
+    # Confirmed on the session the request used, without a second round-trip
+    assert db_session.get(StoredFile, file_id) is None
 
 
-def test_storage_stats(client):
+def test_storage_stats(client, admin_ctx):
     """Test getting storage statistics."""
-    res = client.post("/api/auth/register", json={"email": "file6@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Stats Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
+    _, project_id, headers = admin_ctx
     
-    files = {"file": ("stats.txt", io.BytesIO(b"stats content here"), "text/plain")}
-    client.post(f"/api/projects/{project_id}/files/upload", files=files, headers=auth_headers(token))
+    upload(client, project_id, headers, name="stats.txt")
     
-    stats_res = client.get(f"/api/projects/{project_id}/files/stats", headers=auth_headers(token))
+    stats_res = client.get(f"/api/projects/{project_id}/files/stats", headers=headers)
     assert stats_res.status_code == 200
     data = stats_res.json()
     assert data["file_count"] >= 1
     assert data["total_bytes"] > 0
 
 
-def test_file_not_found(client):
+def test_file_not_found(client, admin_ctx):
     """Test 404 for non-existent file."""
-    res = client.post("/api/auth/register", json={"email": "file7@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Not Found Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
+    _, project_id, headers = admin_ctx
     
-    get_res = client.get(f"/api/projects/{project_id}/files/nonexistent-id", headers=auth_headers(token))
+    get_res = client.get(f"/api/projects/{project_id}/files/nonexistent-id", headers=headers)
     assert get_res.status_code == 404
 
 
-def test_filter_by_bucket(client):
+def test_filter_by_bucket(client, db_session, admin_ctx):
     """Test filtering files by bucket."""
-    res = client.post("/api/auth/register", json={"email": "file8@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Bucket Filter Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
-    
-    files1 = {"file": ("doc1.txt", io.BytesIO(b"doc1"), "text/plain")}
-    client.post(f"/api/projects/{project_id}/files/upload", files=files1, data={"bucket": "docs"}, headers=auth_headers(token))
-    
-    files2 = {"file": ("img1.png", io.BytesIO(b"img1"), "image/png")}
-    client.post(f"/api/projects/{project_id}/files/upload", files=files2, data={"bucket": "images"}, headers=auth_headers(token))
+    _, project_id, headers = admin_ctx
+    seed_files(db_session, project_id, [
+        {"name": "doc1.txt", "bucket": "docs"},
+        {"name": "img1.png", "content_type": "image/png", "bucket": "images"},
+    ])
     
-    docs_res = client.get(f"/api/projects/{project_id}/files?bucket=docs", headers=auth_headers(token))
+    docs_res = client.get(f"/api/projects/{project_id}/files?bucket=docs", headers=headers)
     assert docs_res.status_code == 200
     docs = docs_res.json()
     assert all(f["bucket"] == "docs" for f in docs)
@@ -1,164 +1,153 @@
 import json
 
+import pytest
 
-def auth_headers(token: str) -> dict:
-    return {"Authorization": f"Bearer {token}"}
+from app.models.collection import Collection
+from app.models.policy import Policy
 
-
-def bootstrap_project_with_collection(client):
-    res = client.post("/api/auth/register", json={"email": "policy@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    project = client.post("/api/projects", json={"name": "Policy Project"}, headers=auth_headers(token)).json()
-    client.post(
-        f"/api/projects/{project['id']}/schema/collections",
-        json={"name": "items", "display_name": "Items"},
-        headers=auth_headers(token),
-    )
-    return token, project["id"]
+from .conftest import ok
 
 
-def test_create_policy(client):
-    token, project_id = bootstrap_project_with_collection(client)
-    res = client.post(
-        f"/api/projects/{project_id}/schema/collections/items/policies",
-        json={"name": "allow_read", "action": "read", "effect": "allow"},
-        headers=auth_headers(token),
-    )
-    assert res.status_code == 201
-    data = res.json()
-    assert data["name"] == "allow_read"
-    assert data["action"] == "read"
-    assert data["effect"] == "allow"
-    assert data["is_active"] is True
+@pytest.fixture(scope="module")
+def items_ctx(client_module, admin_ctx):
+    """admin_ctx whose project has an "items" collection, created once per module."""
+    _, project_id, headers = admin_ctx
+    ok(client_module.post(
+        f"/api/projects/{project_id}/schema/collections",
+        json={"name": "items", "display_name": "Items"},
+        headers=headers,
+    ), 201)
+    return admin_ctx
 
 
-def test_list_policies(client):
-    token, project_id = bootstrap_project_with_collection(client)
-    client.post(
-        f"/api/projects/{project_id}/schema/collections/items/policies",
-        json={"name": "p1", "action": "read", "effect": "allow"},
-        headers=auth_headers(token),
-    )
-    client.post(
-        f"/api/projects/{project_id}/schema/collections/items/policies",
-        json={"name": "p2", "action": "create", "effect": "deny"},
-        headers=auth_headers(token),
-    )
-    res = client.get(
-        f"/api/projects/{project_id}/schema/collections/items/policies",
-        headers=auth_headers(token),
-    )
-    assert res.status_code == 200
-    data = res.json()
-    assert len(data) == 2
+def seed_policies(db_session, project_id, collection_name, specs):
+    """Insert policies in one flush; for tests about listing, not creating."""
+    collection = db_session.query(Collection).filter(
+        Collection.project_id == project_id, Collection.name == collection_name
+    ).one()
+    db_session.add_all([Policy(collection_id=collection.id, **spec) for spec in specs])
+    db_session.flush()
 
 
-def test_get_policy(client):
-    token, project_id = bootstrap_project_with_collection(client)
-    create_res = client.post(
-        f"/api/projects/{project_id}/schema/collections/items/policies",
-        json={"name": "get_me", "action": "read", "effect": "allow"},
-        headers=auth_headers(token),
-    )
-    policy_id = create_res.json()["id"]
+class TestPolicyCRUD:
+    """Create, read, update and delete one policy created once per class."""
+    
+    @pytest.fixture(scope="class")
+    def created(self, client_class, items_ctx):
+        # Created inside the class SAVEPOINT; each test's changes roll back after it
+        _, project_id, headers = items_ctx
+        res = client_class.post(
+            f"/api/projects/{project_id}/schema/collections/items/policies",
+            json={"name": "allow_read", "action": "read", "effect": "allow"},
+            headers=headers,
+        )
+        return res.status_code, res.json()
+    
+    def test_create_policy(self, created):
+        status_code, data = created
+        assert status_code == 201
+        assert data["name"] == "allow_read"
+        assert data["action"] == "read"
+        assert data["effect"] == "allow"
+        assert data["is_active"] is True
+    
+    def test_get_policy(self, client, items_ctx, created):
+        _, project_id, headers = items_ctx
+        policy_id = created[1]["id"]
+        res = client.get(
+            f"/api/projects/{project_id}/schema/collections/items/policies/{policy_id}",
+            headers=headers,
+        )
+        assert res.status_code == 200
+        assert res.json()["name"] == "allow_read"
+    
+    def test_update_policy(self, client, items_ctx, created):
+        _, project_id, headers = items_ctx
+        policy_id = created[1]["id"]
+        res = client.patch(
+            f"/api/projects/{project_id}/schema/collections/items/policies/{policy_id}",
+            json={"effect": "deny", "priority": 10},
+            headers=headers,
+        )
+        assert res.status_code == 200
+        data = res.json()
+        assert data["effect"] == "deny"
+        assert data["priority"] == 10
     
+    def test_delete_policy(self, client, db_session, items_ctx, created):
+        _, project_id, headers = items_ctx
+        policy_id = created[1]["id"]
+        res = client.delete(
+            f"/api/projects/{project_id}/schema/collections/items/policies/{policy_id}",
+            headers=headers,
+        )
+        assert res.status_code == 204
+        # Confirmed on the session the request used, without a second round-trip
+        assert db_session.get(Policy, policy_id) is None
+
+
+def test_list_policies(client, db_session, items_ctx):
+    _, project_id, headers = items_ctx
+    seed_policies(db_session, project_id, "items", [
+        {"name": "p1", "action": "read", "effect": "allow"},
+        {"name": "p2", "action": "create", "effect": "deny"},
+    ])
     res = client.get(
-        f"/api/projects/{project_id}/schema/collections/items/policies/{policy_id}",
-        headers=auth_headers(token),
-    )
-    assert res.status_code == 200
-    assert res.json()["name"] == "get_me"
-
-
-def test_update_policy(client):
-    token, project_id = bootstrap_project_with_collection(client)
-    create_res = client.post(
         f"/api/projects/{project_id}/schema/collections/items/policies",
-        json={"name": "update_me", "action": "read", "effect": "allow"},
-        headers=auth_headers(token),
-    )
-    policy_id = create_res.json()["id"]
-    
-    res = client.patch(
-        f"/api/projects/{project_id}/schema/collections/items/policies/{policy_id}",
-        json={"effect": "deny", "priority": 10},
-        headers=auth_headers(token),
+        headers=headers,
     )
     assert res.status_code == 200
     data = res.json()
-    assert data["effect"] == "deny"
-    assert data["priority"] == 10
-
-
-def test_delete_policy(client):
-    token, project_id = bootstrap_project_with_collection(client)
-    create_res = client.post(
-        f"/api/projects/{project_id}/schema/collections/items/policies",
-        json={"name": "delete_me", "action": "read", "effect": "allow"},
-        headers=auth_headers(token),
-    )
-    policy_id = create_res.json()["id"]
-    
-    res = client.delete(
-        f"/api/projects/{project_id}/schema/collections/items/policies/{policy_id}",
-        headers=auth_headers(token),
-    )
-    assert res.status_code == 204
-    
-    get_res = client.get(
-        f"/api/projects/{project_id}/schema/collections/items/policies/{policy_id}",
-        headers=auth_headers(token),
-    )
-    assert get_res.status_code == 404
+    assert len(data) == 2
 
 
-def test_create_policy_invalid_action(client):
-    token, project_id = bootstrap_project_with_collection(client)
+def test_create_policy_invalid_action(client, items_ctx):
+    _, project_id, headers = items_ctx
     res = client.post(
         f"/api/projects/{project_id}/schema/collections/items/policies",
         json={"name": "bad", "action": "invalid_action", "effect": "allow"},
-        headers=auth_headers(token),
+        headers=headers,
     )
     assert res.status_code == 400
 
 
-def test_create_policy_invalid_effect(client):
-    token, project_id = bootstrap_project_with_collection(client)
+def test_create_policy_invalid_effect(client, items_ctx):
+    _, project_id, headers = items_ctx
     res = client.post(
         f"/api/projects/{project_id}/schema/collections/items/policies",
         json={"name": "bad", "action": "read", "effect": "invalid_effect"},
-        headers=auth_headers(token),
+        headers=headers,
     )
     assert res.status_code == 400
 
 
-def test_create_policy_with_condition(client):
-    token, project_id = bootstrap_project_with_collection(client)
+def test_create_policy_with_condition(client, items_ctx):
+    _, project_id, headers = items_ctx
     condition = json.dumps({"type": "authenticated"})
     res = client.post(
         f"/api/projects/{project_id}/schema/collections/items/policies",
         json={"name": "auth_only", "action": "read", "effect": "allow", "condition_json": condition},
-        headers=auth_headers(token),
+        headers=headers,
     )
     assert res.status_code == 201
     data = res.json()
     assert data["condition_json"] == condition
 
 
-def test_create_policy_invalid_condition_json(client):
-    token, project_id = bootstrap_project_with_collection(client)
+def test_create_policy_invalid_condition_json(client, items_ctx):
+    _, project_id, headers = items_ctx
     res = client.post(
         f"/api/projects/{project_id}/schema/collections/items/policies",
         json={"name": "bad", "action": "read", "effect": "allow", "condition_json": "not valid json"},
-        headers=auth_headers(token),
+        headers=headers,
     )
     assert res.status_code == 400
 
 
-def test_policy_not_found(client):
-    token, project_id = bootstrap_project_with_collection(client)
+def test_policy_not_found(client, items_ctx):
+    _, project_id, headers = items_ctx
     res = client.get(
         f"/api/projects/{project_id}/schema/collections/items/policies/nonexistent-id",
-        headers=auth_headers(token),
+        headers=headers,
     )
     assert res.status_code == 404
@@ -1,21 +1,20 @@
 """Tests for RBAC (Role-Based Access Control) endpoints."""
+import pytest
 
+from app.models.role import Role
 
-def auth_headers(token: str) -> dict:
-    return {"Authorization": f"Bearer {token}"}
+from .test_auth import auth_headers
 
 
-def bootstrap_project(client):
-    """Create a user and project for testing."""
-    res = client.post("/api/auth/register", json={"email": "rbac@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    project = client.post("/api/projects", json={"name": "RBAC Project"}, headers=auth_headers(token)).json()
-    return token, project["id"]
+def bootstrap_project(admin_ctx):
+    """Token and project id of the module's shared project."""
+    token, project_id, _ = admin_ctx
+    return token, project_id
 
 
-def bootstrap_project_with_app_user(client):
+def bootstrap_project_with_app_user(client, admin_ctx):
     """Create a user, project, and app user for testing."""
-    token, project_id = bootstrap_project(client)
+    token, project_id = bootstrap_project(admin_ctx)
     # Create an app user via the auth settings endpoint
     app_user_res = client.post(
         f"/api/projects/{project_id}/auth/signup",
@@ -25,32 +24,83 @@ def bootstrap_project_with_app_user(client):
     return token, project_id, app_user_id
 
 
-# ============== ROLE TESTS ==============
+def seed_roles(db_session, project_id, specs):
+    """Insert roles in one flush; for tests about listing, not creating."""
+    db_session.add_all([Role(project_id=project_id, **spec) for spec in specs])
+    db_session.flush()
 
-def test_create_role(client):
-    """Test creating a new role."""
-    token, project_id = bootstrap_project(client)
-    res = client.post(
-        f"/api/projects/{project_id}/rbac/roles",
-        json={
-            "name": "editor",
-            "display_name": "Editor",
-            "description": "Can edit content",
-        },
-        headers=auth_headers(token),
-    )
-    assert res.status_code == 201
-    data = res.json()
-    assert data["name"] == "editor"
-    assert data["display_name"] == "Editor"
-    assert data["description"] == "Can edit content"
-    assert data["is_system"] is False
-    assert data["is_default"] is False
 
+# ============== ROLE TESTS ==============
 
-def test_create_role_duplicate_name(client):
+class TestRoleCRUD:
+    """Create, read, update and delete one role created once per class."""
+    
+    @pytest.fixture(scope="class")
+    def created(self, client_class, admin_ctx):
+        # Created inside the class SAVEPOINT; each test's changes roll back after it
+        token, project_id = bootstrap_project(admin_ctx)
+        res = client_class.post(
+            f"/api/projects/{project_id}/rbac/roles",
+            json={
+                "name": "editor",
+                "display_name": "Editor",
+                "description": "Can edit content",
+            },
+            headers=auth_headers(token),
+        )
+        return res.status_code, res.json()
+    
+    def test_create_role(self, created):
+        """Test creating a new role."""
+        status_code, data = created
+        assert status_code == 201
+        assert data["name"] == "editor"
+        assert data["display_name"] == "Editor"
+        assert data["description"] == "Can edit content"
+        assert data["is_system"] is False
+        assert data["is_default"] is False
+    
+    def test_get_role(self, client, admin_ctx, created):
+        """Test getting a single role by ID."""
+        token, project_id = bootstrap_project(admin_ctx)
+        role_id = created[1]["id"]
+        res = client.get(
+            f"/api/projects/{project_id}/rbac/roles/{role_id}",
+            headers=auth_headers(token),
+        )
+        assert res.status_code == 200
+        assert res.json()["name"] == "editor"
+    
+    def test_update_role(self, client, admin_ctx, created):
+        """Test updating a role."""
+        token, project_id = bootstrap_project(admin_ctx)
+        role_id = created[1]["id"]
+        res = client.patch(
+            f"/api/projects/{project_id}/rbac/roles/{role_id}",
+            json={"display_name": "Updated Role", "is_default": True},
+            headers=auth_headers(token),
+        )
+        assert res.status_code == 200
+        data = res.json()
+        assert data["display_name"] == "Updated Role"
+        assert data["is_default"] is True
+    
+    def test_delete_role(self, client, db_session, admin_ctx, created):
+        """Test deleting a role."""
+        token, project_id = bootstrap_project(admin_ctx)
+        role_id = created[1]["id"]
+        res = client.delete(
+            f"/api/projects/{project_id}/rbac/roles/{role_id}",
+            headers=auth_headers(token),
+        )
+        assert res.status_code == 204
+        # Confirmed on the session the request used, without a second round-trip
+        assert db_session.get(Role, role_id) is None
+
+
+def test_create_role_duplicate_name(client, admin_ctx):
     """Test that creating a role with duplicate name fails."""
-    token, project_id = bootstrap_project(client)
+    token, project_id = bootstrap_project(admin_ctx)
     client.post(
         f"/api/projects/{project_id}/rbac/roles",
         json={"name": "editor", "display_name": "Editor"},
@@ -64,19 +114,13 @@ def test_create_role_duplicate_name(client):
     assert res.status_code == 409
 
 
-def test_list_roles(client):
+def test_list_roles(client, db_session, admin_ctx):
     """Test listing all roles for a project."""
-    token, project_id = bootstrap_project(client)
-    client.post(
-        f"/api/projects/{project_id}/rbac/roles",
-        json={"name": "role1", "display_name": "Role 1"},
-        headers=auth_headers(token),
-    )
-    client.post(
-        f"/api/projects/{project_id}/rbac/roles",
-        json={"name": "role2", "display_name": "Role 2"},
-        headers=auth_headers(token),
-    )
+    token, project_id = bootstrap_project(admin_ctx)
+    seed_roles(db_session, project_id, [
+        {"name": "role1", "display_name": "Role 1"},
+        {"name": "role2", "display_name": "Role 2"},
+    ])
     res = client.get(
         f"/api/projects/{project_id}/rbac/roles",
         headers=auth_headers(token),
@@ -86,27 +130,9 @@ def test_list_roles(client):
     assert len(data) == 2
 
 
-def test_get_role(client):
-    """Test getting a single role by ID."""
-    token, project_id = bootstrap_project(client)
-    create_res = client.post(
-        f"/api/projects/{project_id}/rbac/roles",
-        json={"name": "viewer", "display_name": "Viewer"},
-        headers=auth_headers(token),
-    )
-    role_id = create_res.json()["id"]
-    
-    res = client.get(
-        f"/api/projects/{project_id}/rbac/roles/{role_id}",
-        headers=auth_headers(token),
-    )
-    assert res.status_code == 200
-    assert res.json()["name"] == "viewer"
-
-
-def test_get_role_not_found(client):
+def test_get_role_not_found(client, admin_ctx):
     """Test getting a non-existent role returns 404."""
-    token, project_id = bootstrap_project(client)
+    token, project_id = bootstrap_project(admin_ctx)
     res = client.get(
         f"/api/projects/{project_id}/rbac/roles/nonexistent-id",
         headers=auth_headers(token),
@@ -114,57 +140,13 @@ def test_get_role_not_found(client):
     assert res.status_code == 404
 
 
-def test_update_role(client):
-    """Test updating a role."""
-    token, project_id = bootstrap_project(client)
-    create_res = client.post(
-        f"/api/projects/{project_id}/rbac/roles",
-        json={"name": "updatable", "display_name": "Updatable Role"},
-        headers=auth_headers(token),
-    )
-    role_id = create_res.json()["id"]
-    
-    res = client.patch(
-        f"/api/projects/{project_id}/rbac/roles/{role_id}",
-        json={"display_name": "Updated Role", "is_default": True},
-        headers=auth_headers(token),
-    )
-    assert res.status_code == 200
-    data = res.json()
-    assert data["display_name"] == "Updated Role"
-    assert data["is_default"] is True
-
-
-def test_delete_role(client):
-    """Test deleting a role."""
-    token, project_id = bootstrap_project(client)
-    create_res = client.post(
-        f"/api/projects/{project_id}/rbac/roles",
-        json={"name": "deletable", "display_name": "Deletable Role"},
-        headers=auth_headers(token),
-    )
-    role_id = create_res.json()["id"]
-    
-    res = client.delete(
-        f"/api/projects/{project_id}/rbac/roles/{role_id}",
-        headers=auth_headers(token),
-    )
-    assert res.status_code == 204
-    
-    get_res = client.get(
-        f"/api/projects/{project_id}/rbac/roles/{role_id}",
-        headers=auth_headers(token),
-    )
-    assert get_res.status_code == 404
-
-
 # ============== PERMISSION TESTS ==============
 
 # ============== INITIALIZATION TESTS ==============
 
-def test_initialize_rbac(client):
+def test_initialize_rbac(client, admin_ctx):
     """Test initializing default roles."""
-    token, project_id = bootstrap_project(client)
+    token, project_id = bootstrap_project(admin_ctx)
     res = client.post(
         f"/api/projects/{project_id}/rbac/initialize",
         headers=auth_headers(token),
@@ -175,9 +157,9 @@ def test_initialize_rbac(client):
     assert data["roles_created"] >= 0
 
 
-def test_initialize_rbac_idempotent(client):
+def test_initialize_rbac_idempotent(client, admin_ctx):
     """Test that initializing RBAC twice doesn't create duplicates."""
-    token, project_id = bootstrap_project(client)
+    token, project_id = bootstrap_project(admin_ctx)
     
     # First initialization
     res1 = client.post(
@@ -205,19 +187,17 @@ def test_rbac_requires_auth(client):
     assert res.status_code == 401
 
 
-def test_rbac_requires_project_membership(client):
+def test_rbac_requires_project_membership(client, admin_ctx):
     """Test that RBAC endpoints require project membership."""
-    # Create two users with different projects
-    res1 = client.post("/api/auth/register", json={"email": "user1@example.com", "password": "password123"})
-    token1 = res1.json()["access_token"]
-    project1 = client.post("/api/projects", json={"name": "Project 1"}, headers=auth_headers(token1)).json()
+    # A second user who is not a member of the shared project
+    _, project_id = bootstrap_project(admin_ctx)
     
     res2 = client.post("/api/auth/register", json={"email": "user2@example.com", "password": "password123"})
     token2 = res2.json()["access_token"]
     
-    # User 2 tries to access User 1's project RBAC
+    # User 2 tries to access the shared project's RBAC
     res = client.get(
-        f"/api/projects/{project1['id']}/rbac/roles",
+        f"/api/projects/{project_id}/rbac/roles",
         headers=auth_headers(token2),
     )
     assert res.status_code in [403, 404]  # Either forbidden or not found is acceptable
@@ -1,37 +1,72 @@
 """Tests for Validations (Milestone M)"""
 import pytest
-from .test_auth import auth_headers
 
-
-def test_create_validation_rule(client):
-    """Test creating a validation rule."""
-    res = client.post("/api/auth/register", json={"email": "val1@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Validation Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
-    
-    coll_res = client.post(
+from app.models.collection import Collection
+from app.models.field import Field
+from app.services import validation_service
+
+from .conftest import ok
+
+FIELD_SPECS = [
+    {"name": "email", "display_name": "Email", "field_type": "string"},
+    {"name": "name", "display_name": "Name", "field_type": "string"},
+    {"name": "price", "display_name": "Price", "field_type": "float"},
+    {"name": "code", "display_name": "Code", "field_type": "string"},
+    {"name": "title", "display_name": "Title", "field_type": "string"},
+    {"name": "status", "display_name": "Status", "field_type": "string"},
+    {"name": "score", "display_name": "Score", "field_type": "int"},
+]
+
+
+@pytest.fixture(scope="module")
+def records(client_module, admin_ctx):
+    """
+    (project_id, headers, collection name) of a collection with every field these
+    tests validate, created once per module. Rules are added per test and rolled back.
+    """
+    _, project_id, headers = admin_ctx
+    ok(client_module.post(
         f"/api/projects/{project_id}/schema/collections",
-        json={"name": "users", "display_name": "Users"},
-        headers=auth_headers(token),
-    )
-    coll_name = coll_res.json()["name"]
-    
-    field_res = client.post(
-        f"/api/projects/{project_id}/schema/collections/{coll_name}/fields",
-        json={"name": "email", "display_name": "Email", "field_type": "string"},
-        headers=auth_headers(token),
-    )
-    field_name = field_res.json()["name"]
-    
+        json={"name": "records", "display_name": "Records"},
+        headers=headers,
+    ), 201)
+    for spec in FIELD_SPECS:
+        ok(client_module.post(
+            f"/api/projects/{project_id}/schema/collections/records/fields",
+            json=spec,
+            headers=headers,
+        ), 201)
+    return project_id, headers, "records"
+
+
+def make_rule(db_session, records, field_name, rule_type, **options):
+    """Add a validation rule through the service; for tests about using rules, not creating them."""
+    project_id, _, coll_name = records
+    field = db_session.query(Field).join(Collection, Field.collection_id == Collection.id).filter(
+        Collection.project_id == project_id,
+        Collection.name == coll_name,
+        Field.name == field_name,
+    ).one()
+    return validation_service.create_validation_rule(db_session, field, rule_type, **options)
+
+
+def validate(client, records, *data):
+    """POST records to the batch validate endpoint and return one result per record."""
+    project_id, headers, coll_name = records
+    return ok(client.post(
+        f"/api/projects/{project_id}/validations/collections/{coll_name}/validate/batch",
+        json={"records": list(data)},
+        headers=headers,
+    ))["results"]
+
+
+def test_create_validation_rule(client, records):
+    """Test creating a validation rule."""
+    project_id, headers, coll_name = records
     rule_res = client.post(
-        f"/api/projects/{project_id}/validations/collections/{coll_name}/fields/{field_name}/rules",
-        json={
-            "rule_type": "email",
-            "error_message": "Please enter a valid email address",
-        },
-        headers=auth_headers(token),
+        f"/api/projects/{project_id}/validations/collections/{coll_name}/fields/email/rules",
+        json={"rule_type": "email", "error_message": "Please enter a valid email address"},
+        headers=headers,
     )
     assert rule_res.status_code == 201
     data = rule_res.json()
@@ -39,180 +74,79 @@ def test_create_validation_rule(client):
     assert data["error_message"] == "Please enter a valid email address"
 
 
-def test_list_validation_rules(client):
+def test_list_validation_rules(client, db_session, records):
     """Test listing validation rules for a field."""
-    res = client.post("/api/auth/register", json={"email": "val2@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "List Rules Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
-    
-    coll_res = client.post(
-        f"/api/projects/{project_id}/schema/collections",
-        json={"name": "products", "display_name": "Products"},
-        headers=auth_headers(token),
-    )
-    coll_name = coll_res.json()["name"]
-    
-    field_res = client.post(
-        f"/api/projects/{project_id}/schema/collections/{coll_name}/fields",
-        json={"name": "name", "display_name": "Name", "field_type": "string"},
-        headers=auth_headers(token),
-    )
-    field_name = field_res.json()["name"]
-    
-    client.post(
-        f"/api/projects/{project_id}/validations/collections/{coll_name}/fields/{field_name}/rules",
-        json={"rule_type": "min_length", "config": {"min": 3}},
-        headers=auth_headers(token),
-    )
-    client.post(
-        f"/api/projects/{project_id}/validations/collections/{coll_name}/fields/{field_name}/rules",
-        json={"rule_type": "max_length", "config": {"max": 100}},
-        headers=auth_headers(token),
-    )
-    
+    project_id, headers, coll_name = records
+    make_rule(db_session, records, "name", "min_length", config={"min": 3})
+    make_rule(db_session, records, "name", "max_length", config={"max": 100})
+
     list_res = client.get(
-        f"/api/projects/{project_id}/validations/collections/{coll_name}/fields/{field_name}/rules",
-        headers=auth_headers(token),
+        f"/api/projects/{project_id}/validations/collections/{coll_name}/fields/name/rules",
+        headers=headers,
     )
     assert list_res.status_code == 200
     rules = list_res.json()
     assert len(rules) >= 2
 
 
-def test_update_validation_rule(client):
+def test_update_validation_rule(client, db_session, records):
     """Test updating a validation rule."""
-    res = client.post("/api/auth/register", json={"email": "val3@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Update Rule Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
-    
-    coll_res = client.post(
-        f"/api/projects/{project_id}/schema/collections",
-        json={"name": "items", "display_name": "Items"},
-        headers=auth_headers(token),
-    )
-    coll_name = coll_res.json()["name"]
-    
-    field_res = client.post(
-        f"/api/projects/{project_id}/schema/collections/{coll_name}/fields",
-        json={"name": "price", "display_name": "Price", "field_type": "float"},
-        headers=auth_headers(token),
-    )
-    field_name = field_res.json()["name"]
-    
-    rule_res = client.post(
-        f"/api/projects/{project_id}/validations/collections/{coll_name}/fields/{field_name}/rules",
-        json={"rule_type": "min_value", "config": {"min": 0}},
-        headers=auth_headers(token),
-    )
-    rule_id = rule_res.json()["id"]
-    
+    project_id, headers, _ = records
+    rule_id = make_rule(db_session, records, "price", "min_value", config={"min": 0}).id
+
     update_res = client.patch(
         f"/api/projects/{project_id}/validations/rules/{rule_id}",
         json={"config": {"min": 0.01}, "error_message": "Price must be positive"},
-        headers=auth_headers(token),
+        headers=headers,
     )
     assert update_res.status_code == 200
-    assert update_res.json()["config"]["min"] == 0.01
-    assert update_res.json()["error_message"] == "Price must be positive"
+    data = update_res.json()
+    assert data["config"]["min"] == 0.01
+    assert data["error_message"] == "Price must be positive"
 
 
-def test_delete_validation_rule(client):
+def test_delete_validation_rule(client, db_session, records):
     """Test deleting a validation rule."""
-    res = client.post("/api/auth/register", json={"email": "val4@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Delete Rule Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
-    
-    coll_res = client.post(
-        f"/api/projects/{project_id}/schema/collections",
-        json={"name": "data", "display_name": "Data"},
-        headers=auth_headers(token),
-    )
-    coll_name = coll_res.json()["name"]
-    
-    field_res = client.post(
-        f"/api/projects/{project_id}/schema/collections/{coll_name}/fields",
-        json={"name": "code", "display_name": "Code", "field_type": "string"},
-        headers=auth_headers(token),
-    )
-    field_name = field_res.json()["name"]
-    
-    rule_res = client.post(
-        f"/api/projects/{project_id}/validations/collections/{coll_name}/fields/{field_name}/rules",
-        json={"rule_type": "not_empty"},
-        headers=auth_headers(token),
-    )
-    rule_id = rule_res.json()["id"]
-    
+    project_id, headers, _ = records
+    rule_id = make_rule(db_session, records, "code", "not_empty").id
+
     delete_res = client.delete(
         f"/api/projects/{project_id}/validations/rules/{rule_id}",
-        headers=auth_headers(token),
+        headers=headers,
     )
     assert delete_res.status_code == 204
 
 
-def test_validate_record(client):
+def test_validate_record(client, db_session, records):
     """Test validating a record against rules."""
-    res = client.post("/api/auth/register", json={"email": "val5@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Validate Record Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
-    
-    coll_res = client.post(
-        f"/api/projects/{project_id}/schema/collections",
-        json={"name": "contacts", "display_name": "Contacts"},
-        headers=auth_headers(token),
-    )
-    coll_name = coll_res.json()["name"]
-    
-    field_res = client.post(
-        f"/api/projects/{project_id}/schema/collections/{coll_name}/fields",
-        json={"name": "email", "display_name": "Email", "field_type": "string"},
-        headers=auth_headers(token),
-    )
-    field_name = field_res.json()["name"]
-    
-    client.post(
-        f"/api/projects/{project_id}/validations/collections/{coll_name}/fields/{field_name}/rules",
-        json={"rule_type": "email"},
-        headers=auth_headers(token),
-    )
-    
-    valid_res = client.post(
-        f"/api/projects/{project_id}/validations/collections/{coll_name}/validate",
-        json={"data": {"email": "test@example.com"}},
-        headers=auth_headers(token),
-    )
-    assert valid_res.status_code == 200
-    assert valid_res.json()["is_valid"] is True
-    
-    invalid_res = client.post(
+    project_id, headers, coll_name = records
+    make_rule(db_session, records, "email", "email")
+
+    data = ok(client.post(
         f"/api/projects/{project_id}/validations/collections/{coll_name}/validate",
         json={"data": {"email": "not-an-email"}},
-        headers=auth_headers(token),
-    )
-    assert invalid_res.status_code == 200
-    assert invalid_res.json()["is_valid"] is False
-    assert "email" in invalid_res.json()["errors"]
+        headers=headers,
+    ))
+    assert data["is_valid"] is False
+    assert "email" in data["errors"]
+
+
+def test_validate_batch(client, db_session, records):
+    """Test that batch validation returns one result per record, in order."""
+    make_rule(db_session, records, "email", "email")
 
+    valid, invalid = validate(client, records, {"email": "test@example.com"}, {"email": "not-an-email"})
+    assert valid == {"is_valid": True, "errors": {}}
+    assert invalid["is_valid"] is False
+    assert "email" in invalid["errors"]
 
-def test_get_rule_types(client):
+
+def test_get_rule_types(client, admin_ctx):
     """Test getting available rule types."""
-    res = client.post("/api/auth/register", json={"email": "val6@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Rule Types Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
-    
+    _, project_id, headers = admin_ctx
     types_res = client.get(
         f"/api/projects/{project_id}/validations/rule-types",
-        headers=auth_headers(token),
+        headers=headers,
     )
     assert types_res.status_code == 200
     data = types_res.json()
@@ -220,135 +154,39 @@ def test_get_rule_types(client):
     assert len(data["rule_types"]) >= 10
 
 
-def test_min_max_length_validation(client):
+def test_min_max_length_validation(client, db_session, records):
     """Test min/max length validation rules."""
-    res = client.post("/api/auth/register", json={"email": "val7@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Length Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
-    
-    coll_res = client.post(
-        f"/api/projects/{project_id}/schema/collections",
-        json={"name": "posts", "display_name": "Posts"},
-        headers=auth_headers(token),
-    )
-    coll_name = coll_res.json()["name"]
-    
-    field_res = client.post(
-        f"/api/projects/{project_id}/schema/collections/{coll_name}/fields",
-        json={"name": "title", "display_name": "Title", "field_type": "string"},
-        headers=auth_headers(token),
-    )
-    field_name = field_res.json()["name"]
-    
-    client.post(
-        f"/api/projects/{project_id}/validations/collections/{coll_name}/fields/{field_name}/rules",
-        json={"rule_type": "min_length", "config": {"min": 5}},
-        headers=auth_headers(token),
-    )
-    client.post(
-        f"/api/projects/{project_id}/validations/collections/{coll_name}/fields/{field_name}/rules",
-        json={"rule_type": "max_length", "config": {"max": 100}},
-        headers=auth_headers(token),
-    )
-    
-    short_res = client.post(
-        f"/api/projects/{project_id}/validations/collections/{coll_name}/validate",
-        json={"data": {"title": "Hi"}},
-        headers=auth_headers(token),
-    )
-    assert short_res.json()["is_valid"] is False
-    
-    valid_res = client.post(
-        f"/api/projects/{project_id}/validations/collections/{coll_name}/validate",
-        json={"data": {"title": "Hello World"}},
-        headers=auth_headers(token),
-    )
-    assert valid_res.json()["is_valid"] is True
+    make_rule(db_session, records, "title", "min_length", config={"min": 5})
+    make_rule(db_session, records, "title", "max_length", config={"max": 100})
 
+    short, long_enough = validate(client, records, {"title": "Hi"}, {"title": "Hello World"})
+    assert short["is_valid"] is False
+    assert long_enough["is_valid"] is True
 
-def test_enum_validation(client):
+
+def test_enum_validation(client, db_session, records):
     """Test enum validation rule."""
-    res = client.post("/api/auth/register", json={"email": "val8@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Enum Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
-    
-    coll_res = client.post(
-        f"/api/projects/{project_id}/schema/collections",
-        json={"name": "orders", "display_name": "Orders"},
-        headers=auth_headers(token),
-    )
-    coll_name = coll_res.json()["name"]
-    
-    field_res = client.post(
-        f"/api/projects/{project_id}/schema/collections/{coll_name}/fields",
-        json={"name": "status", "display_name": "Status", "field_type": "string"},
-        headers=auth_headers(token),
-    )
-    field_name = field_res.json()["name"]
-    
-    client.post(
-        f"/api/projects/{project_id}/validations/collections/{coll_name}/fields/{field_name}/rules",
-        json={"rule_type": "enum", "config": {"values": ["pending", "shipped", "delivered"]}},
-        headers=auth_headers(token),
-    )
-    
-    valid_res = client.post(
-        f"/api/projects/{project_id}/validations/collections/{coll_name}/validate",
-        json={"data": {"status": "pending"}},
-        headers=auth_headers(token),
-    )
-    assert valid_res.json()["is_valid"] is True
-    
-    invalid_res = client.post(
-        f"/api/projects/{project_id}/validations/collections/{coll_name}/validate",
-        json={"data": {"status": "cancelled"}},
-        headers=auth_headers(token),
-    )
-    assert invalid_res.json()["is_valid"] is False
+    make_rule(db_session, records, "status", "enum", config={"values": ["pending", "shipped", "delivered"]})
+
+    allowed, rejected = validate(client, records, {"status": "pending"}, {"status": "cancelled"})
+    assert allowed["is_valid"] is True
+    assert rejected["is_valid"] is False
 
 
-def test_range_validation(client):
+def test_range_validation(client, db_session, records):
     """Test range validation rule."""
-    res = client.post("/api/auth/register", json={"email": "val9@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Range Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
-    
-    coll_res = client.post(
-        f"/api/projects/{project_id}/schema/collections",
-        json={"name": "ratings", "display_name": "Ratings"},
-        headers=auth_headers(token),
-    )
-    coll_name = coll_res.json()["name"]
-    
-    field_res = client.post(
-        f"/api/projects/{project_id}/schema/collections/{coll_name}/fields",
-        json={"name": "score", "display_name": "Score", "field_type": "int"},
-        headers=auth_headers(token),
-    )
-    field_name = field_res.json()["name"]
-    
-    client.post(
-        f"/api/projects/{project_id}/validations/collections/{coll_name}/fields/{field_name}/rules",
-        json={"rule_type": "range", "config": {"min": 1, "max": 5}},
-        headers=auth_headers(token),
-    )
-    
-    valid_res = client.post(
-        f"/api/projects/{project_id}/validations/collections/{coll_name}/validate",
-        json={"data": {"score": 3}},
-        headers=auth_headers(token),
-    )
-    assert valid_res.json()["is_valid"] is True
-    
-    invalid_res = client.post(
-        f"/api/projects/{project_id}/validations/collections/{coll_name}/validate",
-        json={"data": {"score": 10}},
-        headers=auth_headers(token),
-    )
-    assert invalid_res.json()["is_valid"] is False
+    make_rule(db_session, records, "score", "range", config={"min": 1, "max": 5})
+
+    in_range, out_of_range = validate(client, records, {"score": 3}, {"score": 10})
+    assert in_range["is_valid"] is True
+    assert out_of_range["is_valid"] is False
+
+
+def test_regex_validation(client, db_session, records):
+    """Test regex validation rule with flags."""
+    make_rule(db_session, records, "code", "regex", config={"pattern": "^[a-z]{3}-\\d+$", "flags": "i"})
+
+    upper, lower, malformed = validate(client, records, {"code": "ABC-12"}, {"code": "abc-7"}, {"code": "abc12"})
+    assert upper["is_valid"] is True
+    assert lower["is_valid"] is True
+    assert malformed["errors"] == {"code": ["Does not match required pattern"]}
@@ -1,22 +1,61 @@
 """Tests for Views (Milestone L)"""
 import pytest
-from .test_auth import auth_headers
+from sqlalchemy import text
 
+from app.models.project import Project
+from app.models.view import View
+from app.services import view_service
+from app.services.crud_service import _get_table_ref
 
-def test_create_view(client):
-    """Test creating a view."""
-    res = client.post("/api/auth/register", json={"email": "view1@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "View Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
-    
-    coll_res = client.post(
+from .conftest import ok
+
+
+@pytest.fixture(scope="module")
+def items(client_module, admin_ctx):
+    """
+    (project_id, headers, collection_id) of an items collection with title and
+    status fields, created once per module. Views and rows are added per test.
+    """
+    _, project_id, headers = admin_ctx
+    collection = ok(client_module.post(
         f"/api/projects/{project_id}/schema/collections",
-        json={"name": "products", "display_name": "Products"},
-        headers=auth_headers(token),
+        json={"name": "items", "display_name": "Items"},
+        headers=headers,
+    ), 201)
+    for name in ("title", "status"):
+        ok(client_module.post(
+            f"/api/projects/{project_id}/schema/collections/items/fields",
+            json={"name": name, "display_name": name.title(), "field_type": "string"},
+            headers=headers,
+        ), 201)
+    return project_id, headers, collection["id"]
+
+
+def seed_items(db_session, project_id, rows):
+    """Insert item rows in one executemany; for tests about reading, not writing."""
+    table_ref = _get_table_ref(db_session, project_id, "items")
+    db_session.execute(
+        text(f"INSERT INTO {table_ref} (title, status) VALUES (:title, :status)"),
+        [{"title": None, "status": None, **row} for row in rows],
     )
-    collection_id = coll_res.json()["id"]
+
+
+def make_view(db_session, items, name, display_name, **options):
+    """Create a view on items through the service; for tests about using views, not creating them."""
+    project_id, _, collection_id = items
+    return view_service.create_view(
+        db_session,
+        db_session.get(Project, project_id),
+        name=name,
+        display_name=display_name,
+        base_collection_id=collection_id,
+        **options,
+    )
+
+
+def test_create_view(client, items):
+    """Test creating a view."""
+    project_id, headers, collection_id = items
     
     view_res = client.post(
         f"/api/projects/{project_id}/views",
@@ -29,7 +68,7 @@ def test_create_view(client):
             "filters": [{"field": "id", "operator": ">", "value": 0}],
             "sorts": [{"field": "created_at", "desc": True}],
         },
-        headers=auth_headers(token),
+        headers=headers,
     )
     assert view_res.status_code == 201
     data = view_res.json()
@@ -39,193 +78,97 @@ def test_create_view(client):
     assert data["projection"] == ["id", "created_at"]
 
 
-def test_list_views(client):
+def test_list_views(client, db_session, items):
     """Test listing views."""
-    res = client.post("/api/auth/register", json={"email": "view2@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "List Views Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
-    
-    coll_res = client.post(
-        f"/api/projects/{project_id}/schema/collections",
-        json={"name": "items", "display_name": "Items"},
-        headers=auth_headers(token),
-    )
-    collection_id = coll_res.json()["id"]
+    project_id, headers, _ = items
     
-    client.post(
-        f"/api/projects/{project_id}/views",
-        json={"name": "view_a", "display_name": "View A", "base_collection_id": collection_id},
-        headers=auth_headers(token),
-    )
-    client.post(
-        f"/api/projects/{project_id}/views",
-        json={"name": "view_b", "display_name": "View B", "base_collection_id": collection_id},
-        headers=auth_headers(token),
-    )
+    make_view(db_session, items, "view_a", "View A")
+    make_view(db_session, items, "view_b", "View B")
     
-    list_res = client.get(f"/api/projects/{project_id}/views", headers=auth_headers(token))
+    list_res = client.get(f"/api/projects/{project_id}/views", headers=headers)
     assert list_res.status_code == 200
     views = list_res.json()
     assert len(views) >= 2
 
 
-def test_get_view(client):
+def test_get_view(client, db_session, items):
     """Test getting a view by name."""
-    res = client.post("/api/auth/register", json={"email": "view3@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Get View Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
+    project_id, headers, _ = items
     
-    coll_res = client.post(
-        f"/api/projects/{project_id}/schema/collections",
-        json={"name": "data", "display_name": "Data"},
-        headers=auth_headers(token),
-    )
-    collection_id = coll_res.json()["id"]
-    
-    client.post(
-        f"/api/projects/{project_id}/views",
-        json={"name": "my_view", "display_name": "My View", "base_collection_id": collection_id},
-        headers=auth_headers(token),
-    )
+    make_view(db_session, items, "my_view", "My View")
     
-    get_res = client.get(f"/api/projects/{project_id}/views/my_view", headers=auth_headers(token))
+    get_res = client.get(f"/api/projects/{project_id}/views/my_view", headers=headers)
     assert get_res.status_code == 200
     assert get_res.json()["name"] == "my_view"
 
 
-def test_update_view(client):
+def test_update_view(client, db_session, items):
     """Test updating a view creates a new version."""
-    res = client.post("/api/auth/register", json={"email": "view4@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Update View Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
-    
-    coll_res = client.post(
-        f"/api/projects/{project_id}/schema/collections",
-        json={"name": "records", "display_name": "Records"},
-        headers=auth_headers(token),
-    )
-    collection_id = coll_res.json()["id"]
+    project_id, headers, _ = items
     
-    client.post(
-        f"/api/projects/{project_id}/views",
-        json={"name": "versioned_view", "display_name": "Versioned", "base_collection_id": collection_id},
-        headers=auth_headers(token),
-    )
+    make_view(db_session, items, "versioned_view", "Versioned")
     
     update_res = client.patch(
         f"/api/projects/{project_id}/views/versioned_view",
         json={"display_name": "Updated View", "filters": [{"field": "id", "operator": "=", "value": 1}]},
-        headers=auth_headers(token),
+        headers=headers,
     )
     assert update_res.status_code == 200
     assert update_res.json()["version"] == 2
     assert update_res.json()["display_name"] == "Updated View"
 
 
-def test_delete_view(client):
+def test_delete_view(client, db_session, items):
     """Test deleting a view."""
-    res = client.post("/api/auth/register", json={"email": "view5@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Delete View Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
+    project_id, headers, _ = items
     
-    coll_res = client.post(
-        f"/api/projects/{project_id}/schema/collections",
-        json={"name": "temp", "display_name": "Temp"},
-        headers=auth_headers(token),
-    )
-    collection_id = coll_res.json()["id"]
-    
-    client.post(
-        f"/api/projects/{project_id}/views",
-        json={"name": "to_delete", "display_name": "To Delete", "base_collection_id": collection_id},
-        headers=auth_headers(token),
-    )
+    make_view(db_session, items, "to_delete", "To Delete")
     
-    delete_res = client.delete(f"/api/projects/{project_id}/views/to_delete", headers=auth_headers(token))
+    delete_res = client.delete(f"/api/projects/{project_id}/views/to_delete", headers=headers)
     assert delete_res.status_code == 204
     
-    get_res = client.get(f"/api/projects/{project_id}/views/to_delete", headers=auth_headers(token))
+    get_res = client.get(f"/api/projects/{project_id}/views/to_delete", headers=headers)
     assert get_res.status_code == 404
 
 
-def test_view_versions(client):
-    """Test getting view versions."""
-    res = client.post("/api/auth/register", json={"email": "view6@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Versions Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
-    
-    coll_res = client.post(
-        f"/api/projects/{project_id}/schema/collections",
-        json={"name": "history", "display_name": "History"},
-        headers=auth_headers(token),
-    )
-    collection_id = coll_res.json()["id"]
+def test_delete_view_removed_elsewhere_after_cached_read(client, db_session, items):
+    """Writes load the current row, not a cached snapshot of a view that is already gone."""
+    project_id, headers, _ = items
     
-    client.post(
-        f"/api/projects/{project_id}/views",
-        json={"name": "history_view", "display_name": "History View", "base_collection_id": collection_id},
-        headers=auth_headers(token),
-    )
+    view = make_view(db_session, items, "gone_elsewhere", "Gone Elsewhere")
+    ok(client.get(f"/api/projects/{project_id}/views/gone_elsewhere", headers=headers))
+    # Another worker deletes the view, leaving this process's cache untouched
+    db_session.query(View).filter(View.id == view.id).update({View.is_active: False})
     
-    client.patch(
-        f"/api/projects/{project_id}/views/history_view",
-        json={"description": "Version 2"},
-        headers=auth_headers(token),
-    )
+    delete_res = client.delete(f"/api/projects/{project_id}/views/gone_elsewhere", headers=headers)
+    assert delete_res.status_code == 404
+
+
+def test_view_versions(client, db_session, items):
+    """Test getting view versions."""
+    project_id, headers, _ = items
     
-    client.patch(
-        f"/api/projects/{project_id}/views/history_view",
-        json={"description": "Version 3"},
-        headers=auth_headers(token),
-    )
+    view = make_view(db_session, items, "history_view", "History View")
+    view_service.update_view(db_session, view, description="Version 2")
+    view_service.update_view(db_session, view, description="Version 3")
     
-    versions_res = client.get(f"/api/projects/{project_id}/views/history_view/versions", headers=auth_headers(token))
+    versions_res = client.get(f"/api/projects/{project_id}/views/history_view/versions", headers=headers)
     assert versions_res.status_code == 200
     versions = versions_res.json()
     assert len(versions) == 3
     assert versions[0]["version"] == 3
 
 
-def test_execute_view(client):
+def test_execute_view(client, db_session, items):
     """Test executing a view."""
-    res = client.post("/api/auth/register", json={"email": "view7@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Execute View Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
-    
-    coll_res = client.post(
-        f"/api/projects/{project_id}/schema/collections",
-        json={"name": "entries", "display_name": "Entries"},
-        headers=auth_headers(token),
-    )
-    collection_id = coll_res.json()["id"]
+    project_id, headers, _ = items
     
-    client.post(
-        f"/api/projects/{project_id}/views",
-        json={
-            "name": "all_entries",
-            "display_name": "All Entries",
-            "base_collection_id": collection_id,
-            "default_limit": 50,
-        },
-        headers=auth_headers(token),
-    )
+    make_view(db_session, items, "all_entries", "All Entries", default_limit=50)
     
     exec_res = client.post(
         f"/api/projects/{project_id}/views/all_entries/execute",
         json={"limit": 10, "offset": 0},
-        headers=auth_headers(token),
+        headers=headers,
     )
     assert exec_res.status_code == 200
     data = exec_res.json()
@@ -235,93 +178,56 @@ def test_execute_view(client):
     assert data["limit"] == 10
 
 
-def test_get_operators(client):
+def test_get_operators(client, admin_ctx):
     """Test getting available operators."""
-    res = client.post("/api/auth/register", json={"email": "view8@example.com", "password": "password123"})
-    token = res.json()["access_token"]
+    _, project_id, headers = admin_ctx
     
-    project_res = client.post("/api/projects", json={"name": "Operators Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
-    
-    ops_res = client.get(f"/api/projects/{project_id}/views/operators", headers=auth_headers(token))
+    ops_res = client.get(f"/api/projects/{project_id}/views/operators", headers=headers)
     assert ops_res.status_code == 200
     data = ops_res.json()
     assert "operators" in data
     assert len(data["operators"]) >= 10
 
 
-def test_view_not_found(client):
+def test_view_not_found(client, admin_ctx):
     """Test 404 for non-existent view."""
-    res = client.post("/api/auth/register", json={"email": "view9@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Not Found Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
+    _, project_id, headers = admin_ctx
     
-    get_res = client.get(f"/api/projects/{project_id}/views/nonexistent", headers=auth_headers(token))
+    get_res = client.get(f"/api/projects/{project_id}/views/nonexistent", headers=headers)
     assert get_res.status_code == 404
 
 
-def test_duplicate_view_name(client):
+def test_duplicate_view_name(client, db_session, items):
     """Test that duplicate view names are rejected."""
-    res = client.post("/api/auth/register", json={"email": "view10@example.com", "password": "password123"})
-    token = res.json()["access_token"]
+    project_id, headers, collection_id = items
     
-    project_res = client.post("/api/projects", json={"name": "Duplicate Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
-    
-    coll_res = client.post(
-        f"/api/projects/{project_id}/schema/collections",
-        json={"name": "stuff", "display_name": "Stuff"},
-        headers=auth_headers(token),
-    )
-    collection_id = coll_res.json()["id"]
-    
-    client.post(
-        f"/api/projects/{project_id}/views",
-        json={"name": "unique_view", "display_name": "Unique", "base_collection_id": collection_id},
-        headers=auth_headers(token),
-    )
+    make_view(db_session, items, "unique_view", "Unique")
     
     dup_res = client.post(
         f"/api/projects/{project_id}/views",
         json={"name": "unique_view", "display_name": "Duplicate", "base_collection_id": collection_id},
-        headers=auth_headers(token),
+        headers=headers,
     )
     assert dup_res.status_code == 400
     assert "already exists" in dup_res.json()["detail"]
 
 
-def test_view_meta(client):
+def test_view_meta(client, db_session, items):
     """Test view meta endpoint (L5.2)."""
-    res = client.post("/api/auth/register", json={"email": "viewmeta@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Meta Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
-    
-    coll_res = client.post(
-        f"/api/projects/{project_id}/schema/collections",
-        json={"name": "items", "display_name": "Items"},
-        headers=auth_headers(token),
-    )
-    collection_id = coll_res.json()["id"]
-    
-    client.post(
-        f"/api/projects/{project_id}/views",
-        json={
-            "name": "meta_test_view",
-            "display_name": "Meta Test View",
-            "base_collection_id": collection_id,
-            "description": "A view for testing meta endpoint",
-            "projection": ["id", "created_at"],
-        },
-        headers=auth_headers(token),
+    project_id, headers, _ = items
+    
+    make_view(
+        db_session,
+        items,
+        "meta_test_view",
+        "Meta Test View",
+        description="A view for testing meta endpoint",
+        projection=["id", "created_at"],
     )
     
     meta_res = client.get(
         f"/api/projects/{project_id}/views/meta_test_view/meta",
-        headers=auth_headers(token),
+        headers=headers,
     )
     assert meta_res.status_code == 200
     data = meta_res.json()
@@ -339,34 +245,12 @@ def test_view_meta(client):
     assert "curl" in data["examples"]
 
 
-def test_parameterized_sort(client):
+def test_parameterized_sort(client, db_session, items):
     """Test view execution with parameterized sort field and direction."""
-    res = client.post("/api/auth/register", json={"email": "paramsort@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-
-    project_res = client.post("/api/projects", json={"name": "Param Sort Test"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
-
-    coll_res = client.post(
-        f"/api/projects/{project_id}/schema/collections",
-        json={"name": "items", "display_name": "Items"},
-        headers=auth_headers(token),
-    )
-    collection_id = coll_res.json()["id"]
-
-    client.post(
-        f"/api/projects/{project_id}/schema/collections/items/fields",
-        json={"name": "title", "display_name": "Title", "field_type": "string"},
-        headers=auth_headers(token),
-    )
+    project_id, headers, collection_id = items
 
     # Create test data
-    for i in range(3):
-        client.post(
-            f"/api/projects/{project_id}/data/items",
-            json={"title": f"Item {i}"},
-            headers=auth_headers(token),
-        )
+    seed_items(db_session, project_id, [{"title": f"Item {i}"} for i in range(3)])
 
     # Create a view with parameterized sort
     view_res = client.post(
@@ -383,7 +267,7 @@ def test_parameterized_sort(client):
                 {"field": "id", "desc": False, "is_param": True, "param_name": "sort_by", "desc_is_param": True, "desc_param_name": "sort_order"}
             ],
         },
-        headers=auth_headers(token),
+        headers=headers,
     )
     assert view_res.status_code == 201
 
@@ -391,7 +275,7 @@ def test_parameterized_sort(client):
     exec_asc = client.post(
         f"/api/projects/{project_id}/views/sorted_items/execute",
         json={"params": {"sort_by": "id", "sort_order": "asc"}},
-        headers=auth_headers(token),
+        headers=headers,
     )
     assert exec_asc.status_code == 200
     data_asc = exec_asc.json()
@@ -401,8 +285,125 @@ def test_parameterized_sort(client):
     exec_desc = client.post(
         f"/api/projects/{project_id}/views/sorted_items/execute",
         json={"params": {"sort_by": "id", "sort_order": "desc"}},
-        headers=auth_headers(token),
+        headers=headers,
     )
     assert exec_desc.status_code == 200
     data_desc = exec_desc.json()
     assert data_desc["data"][0]["id"] > data_desc["data"][1]["id"]  # Descending
+
+
+def test_execute_view_with_filters(client, db_session, items):
+    """Test view execution with static and parameterized filters."""
+    project_id, headers, collection_id = items
+
+    seed_items(db_session, project_id, [
+        {"title": title, "status": task_status}
+        for title, task_status in [("alpha", "open"), ("beta", "open"), ("gamma", "done"), ("alphabet", "archived")]
+    ])
+
+    view_res = client.post(
+        f"/api/projects/{project_id}/views",
+        json={
+            "name": "filtered_tasks",
+            "display_name": "Filtered Tasks",
+            "base_collection_id": collection_id,
+            "filters": [
+                {"field": "status", "operator": "in", "value": ["open", "archived"]},
+                {"field": "title", "operator": "starts_with", "is_param": True, "param_name": "prefix"},
+            ],
+        },
+        headers=headers,
+    )
+    assert view_res.status_code == 201
+
+    exec_res = client.post(
+        f"/api/projects/{project_id}/views/filtered_tasks/execute",
+        json={"params": {"prefix": "alpha"}},
+        headers=headers,
+    )
+    assert exec_res.status_code == 200
+    data = exec_res.json()
+    assert data["total"] == 2
+    assert [row["title"] for row in data["data"]] == ["alpha", "alphabet"]
+
+    # Same view shape with a different bind value
+    exec_res = client.post(
+        f"/api/projects/{project_id}/views/filtered_tasks/execute",
+        json={"params": {"prefix": "b"}},
+        headers=headers,
+    )
+    assert exec_res.status_code == 200
+    data = exec_res.json()
+    assert data["total"] == 1
+    assert data["data"][0]["title"] == "beta"
+
+
+@pytest.fixture
+def windowed_total(monkeypatch):
+    """Run execute_view's Postgres path; SQLite has the window function too."""
+    monkeypatch.setattr(view_service, "_uses_windowed_total", lambda db: True)
+
+
+def test_build_view_sql_windowed_total():
+    """Only the page query carries the window column; the count query stays plain."""
+    count_sql, query_sql = view_service._build_view_sql(
+        "view-id", 1, True, '"coll_items"', '"title"', (('"status"', "=", 0),), (("title", "ASC"),),
+    )
+    assert f"COUNT(*) OVER () AS {view_service.TOTAL_COUNT_COLUMN}" in query_sql.text
+    assert "OVER" not in count_sql.text
+    
+    count_sql, query_sql = view_service._build_fast_view_sql(True, '"coll_items"')
+    assert f"COUNT(*) OVER () AS {view_service.TOTAL_COUNT_COLUMN}" in query_sql.text
+    assert "OVER" not in count_sql.text
+
+
+def test_execute_view_windowed_total(db_session, items, windowed_total):
+    """The total comes from the window column, falling back to COUNT on an empty page past the end."""
+    project_id, _, _ = items
+    project = db_session.get(Project, project_id)
+    
+    seed_items(db_session, project_id, [{"title": f"t{i}", "status": "open"} for i in range(5)])
+    plain = make_view(db_session, items, "windowed_plain", "Windowed Plain")
+    filtered = make_view(
+        db_session, items, "windowed_filtered", "Windowed Filtered",
+        filters=[{"field": "status", "operator": "=", "value": "open"}],
+        sorts=[{"field": "title", "desc": True}],
+    )
+    
+    for view in (plain, filtered):
+        page = view_service.execute_view(db_session, project, view, limit=2)
+        assert page["total"] == 5
+        assert len(page["data"]) == 2
+        assert all(view_service.TOTAL_COUNT_COLUMN not in row for row in page["data"])
+        
+        past_end = view_service.execute_view(db_session, project, view, limit=2, offset=10)
+        assert past_end["data"] == []
+        assert past_end["total"] == 5
+    
+    db_session.execute(text(f"DELETE FROM {_get_table_ref(db_session, project_id, 'items')}"))
+    assert view_service.execute_view(db_session, project, plain, limit=2)["total"] == 0
+
+
+def test_execute_view_stream(client, db_session, items):
+    """Test streaming view execution returns the same shape as execute."""
+    project_id, headers, collection_id = items
+
+    seed_items(db_session, project_id, [{}] * 3)
+
+    make_view(db_session, items, "all_notes", "All Notes")
+
+    exec_res = client.post(
+        f"/api/projects/{project_id}/views/all_notes/execute",
+        json={"limit": 2, "offset": 0},
+        headers=headers,
+    )
+    stream_res = client.post(
+        f"/api/projects/{project_id}/views/all_notes/execute/stream",
+        json={"limit": 2, "offset": 0},
+        headers=headers,
+    )
+    assert stream_res.status_code == 200
+    data = stream_res.json()
+    assert data == exec_res.json()
+    assert data["total"] == 3
+    assert len(data["data"]) == 2
@@ -1,21 +1,42 @@
-from .test_auth import auth_headers
+import pytest
 
+from app.models.webhook import Webhook, WebhookEvent
+from app.services import webhook_service
+
+from .conftest import ok
+
+
+@pytest.fixture(scope="module")
+def items(client_module, admin_ctx):
+    """(project_id, headers) of the shared project with an items collection created once per module."""
+    _, project_id, headers = admin_ctx
+    ok(client_module.post(
+        f"/api/projects/{project_id}/schema/collections",
+        json={"name": "items", "display_name": "Items"},
+        headers=headers,
+    ), 201)
+    return project_id, headers
 
-def test_create_webhook(client):
-    res = client.post("/api/auth/register", json={"email": "webhook1@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Webhook Project"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
 
-    response = client.post(
+def create_webhook(client, project_id, headers, name, url, events):
+    return client.post(
         f"/api/projects/{project_id}/webhooks",
-        json={
-            "name": "Test Webhook",
-            "url": "https://example.com/webhook",
-            "events": ["record.created", "record.updated"],
-        },
-        headers=auth_headers(token),
+        json={"name": name, "url": url, "events": events},
+        headers=headers,
+    )
+
+
+def make_webhook(db_session, project_id, name, url, events):
+    """Create a webhook through the service; for tests about reading webhooks, not creating them."""
+    webhook, _ = webhook_service.create_webhook(db_session, project_id, name, url, events)
+    return webhook
+
+
+def test_create_webhook(client, admin_ctx):
+    _, project_id, headers = admin_ctx
+
+    response = create_webhook(
+        client, project_id, headers, "Test Webhook", "https://example.com/webhook", ["record.created", "record.updated"],
     )
     assert response.status_code == 201
     data = response.json()
@@ -27,129 +48,82 @@ def test_create_webhook(client):
     assert "id" in data
 
 
-def test_list_webhooks(client):
-    res = client.post("/api/auth/register", json={"email": "webhook2@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "List Webhooks Project"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
+def test_list_webhooks(client, db_session, admin_ctx):
+    _, project_id, headers = admin_ctx
 
-    client.post(
-        f"/api/projects/{project_id}/webhooks",
-        json={"name": "Webhook 1", "url": "https://example.com/hook1", "events": ["record.created"]},
-        headers=auth_headers(token),
-    )
-    client.post(
-        f"/api/projects/{project_id}/webhooks",
-        json={"name": "Webhook 2", "url": "https://example.com/hook2", "events": ["record.deleted"]},
-        headers=auth_headers(token),
-    )
+    make_webhook(db_session, project_id, "Webhook 1", "https://example.com/hook1", ["record.created"])
+    make_webhook(db_session, project_id, "Webhook 2", "https://example.com/hook2", ["record.deleted"])
 
-    response = client.get(f"/api/projects/{project_id}/webhooks", headers=auth_headers(token))
+    response = client.get(f"/api/projects/{project_id}/webhooks", headers=headers)
     assert response.status_code == 200
     data = response.json()
     assert len(data) == 2
-    names = [w["name"] for w in data]
-    assert "Webhook 1" in names
-    assert "Webhook 2" in names
+    names = {w["name"] for w in data}
+    assert {"Webhook 1", "Webhook 2"} <= names
 
 
-def test_get_webhook(client):
-    res = client.post("/api/auth/register", json={"email": "webhook3@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Get Webhook Project"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
+def test_get_webhook(client, db_session, admin_ctx):
+    _, project_id, headers = admin_ctx
 
-    create_response = client.post(
-        f"/api/projects/{project_id}/webhooks",
-        json={"name": "Get Test Webhook", "url": "https://example.com/get-test", "events": ["record.created"]},
-        headers=auth_headers(token),
-    )
-    webhook_id = create_response.json()["id"]
+    webhook_id = make_webhook(
+        db_session, project_id, "Get Test Webhook", "https://example.com/get-test", ["record.created"],
+    ).id
 
-    response = client.get(f"/api/projects/{project_id}/webhooks/{webhook_id}", headers=auth_headers(token))
+    response = client.get(f"/api/projects/{project_id}/webhooks/{webhook_id}", headers=headers)
     assert response.status_code == 200
     data = response.json()
     assert data["name"] == "Get Test Webhook"
     assert data["id"] == webhook_id
 
 
-def test_delete_webhook(client):
-    res = client.post("/api/auth/register", json={"email": "webhook4@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Delete Webhook Project"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
+def test_delete_webhook(client, db_session, admin_ctx):
+    _, project_id, headers = admin_ctx
 
-    create_response = client.post(
-        f"/api/projects/{project_id}/webhooks",
-        json={"name": "Delete Test Webhook", "url": "https://example.com/delete-test", "events": ["record.deleted"]},
-        headers=auth_headers(token),
-    )
-    webhook_id = create_response.json()["id"]
+    webhook_id = make_webhook(
+        db_session, project_id, "Delete Test Webhook", "https://example.com/delete-test", ["record.deleted"],
+    ).id
 
-    response = client.delete(f"/api/projects/{project_id}/webhooks/{webhook_id}", headers=auth_headers(token))
+    response = client.delete(f"/api/projects/{project_id}/webhooks/{webhook_id}", headers=headers)
     assert response.status_code == 204
 
-    get_response = client.get(f"/api/projects/{project_id}/webhooks/{webhook_id}", headers=auth_headers(token))
+    get_response = client.get(f"/api/projects/{project_id}/webhooks/{webhook_id}", headers=headers)
     assert get_response.status_code == 404
 
 
-def test_webhook_not_found(client):
-    res = client.post("/api/auth/register", json={"email": "webhook5@example.com", "password": "password123"})
-    token = res.json()["access_token"]
+def test_delete_webhook_after_cached_read_of_removed_row(db_session, admin_ctx):
+    _, project_id, _ = admin_ctx
+    webhook_id = make_webhook(db_session, project_id, "Stale", "https://example.com/stale", ["record.created"]).id
+    webhook_service.get_webhook(db_session, project_id, webhook_id)
     
-    project_res = client.post("/api/projects", json={"name": "Not Found Project"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
-
-    response = client.get(f"/api/projects/{project_id}/webhooks/nonexistent-id", headers=auth_headers(token))
-    assert response.status_code == 404
+    # Another process deletes the row while this one still has it cached
+    db_session.query(WebhookEvent).filter(WebhookEvent.webhook_id == webhook_id).delete()
+    db_session.query(Webhook).filter(Webhook.id == webhook_id).delete()
+    
+    assert webhook_service.delete_webhook(db_session, project_id, webhook_id) is False
 
 
-def test_create_webhook_without_auth(client):
-    res = client.post("/api/auth/register", json={"email": "webhook6@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Unauth Webhook Project"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
+def test_create_webhook_without_auth(client, admin_ctx):
+    _, project_id, _ = admin_ctx
 
-    response = client.post(
-        f"/api/projects/{project_id}/webhooks",
-        json={"name": "Unauthorized Webhook", "url": "https://example.com/unauth", "events": ["record.created"]},
+    response = create_webhook(
+        client, project_id, {}, "Unauthorized Webhook", "https://example.com/unauth", ["record.created"],
     )
     assert response.status_code == 401
 
 
-def test_webhook_delivery_on_record_created(client):
-    res = client.post("/api/auth/register", json={"email": "webhook7@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Delivery Test Project"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
+def test_webhook_delivery_on_record_created(client, items):
+    project_id, headers = items
 
-    webhook_res = client.post(
-        f"/api/projects/{project_id}/webhooks",
-        json={"name": "Record Created Hook", "url": "https://example.com/hook", "events": ["record.created"]},
-        headers=auth_headers(token),
+    webhook_res = create_webhook(
+        client, project_id, headers, "Record Created Hook", "https://example.com/hook", ["record.created"],
     )
     webhook_id = webhook_res.json()["id"]
 
-    client.post(
-        f"/api/projects/{project_id}/schema/collections",
-        json={"name": "items", "display_name": "Items"},
-        headers=auth_headers(token),
-    )
-
-    client.post(
-        f"/api/projects/{project_id}/data/items",
-        json={},
-        headers=auth_headers(token),
-    )
+    client.post(f"/api/projects/{project_id}/data/items", json={}, headers=headers)
 
     deliveries_res = client.get(
         f"/api/projects/{project_id}/webhooks/{webhook_id}/deliveries",
-        headers=auth_headers(token),
+        headers=headers,
     )
     assert deliveries_res.status_code == 200
     deliveries = deliveries_res.json()
@@ -157,23 +131,37 @@ def test_webhook_delivery_on_record_created(client):
     assert deliveries[0]["event_type"] == "record.created"
 
 
-def test_list_webhook_deliveries(client):
-    res = client.post("/api/auth/register", json={"email": "webhook8@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Deliveries List Project"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
+def test_list_webhook_deliveries(client, admin_ctx):
+    _, project_id, headers = admin_ctx
 
-    webhook_res = client.post(
-        f"/api/projects/{project_id}/webhooks",
-        json={"name": "List Deliveries Hook", "url": "https://example.com/hook", "events": ["*"]},
-        headers=auth_headers(token),
+    webhook_res = create_webhook(
+        client, project_id, headers, "List Deliveries Hook", "https://example.com/hook", ["*"],
     )
     webhook_id = webhook_res.json()["id"]
 
     deliveries_res = client.get(
         f"/api/projects/{project_id}/webhooks/{webhook_id}/deliveries",
-        headers=auth_headers(token),
+        headers=headers,
     )
     assert deliveries_res.status_code == 200
     assert isinstance(deliveries_res.json(), list)
+
+
+def test_webhook_delivery_matches_subscribed_events(client, items):
+    project_id, headers = items
+
+    hook_ids = {}
+    for name, events in [("wildcard", ["*"]), ("deleted", ["record.deleted"]), ("both", ["record.created", "*"])]:
+        webhook_res = create_webhook(client, project_id, headers, name, "https://example.com/hook", events)
+        hook_ids[name] = webhook_res.json()["id"]
+
+    client.post(f"/api/projects/{project_id}/data/items", json={}, headers=headers)
+
+    counts = {
+        name: len(client.get(
+            f"/api/projects/{project_id}/webhooks/{hook_id}/deliveries",
+            headers=headers,
+        ).json())
+        for name, hook_id in hook_ids.items()
+    }
+    assert counts == {"wildcard": 1, "deleted": 0, "both": 1}
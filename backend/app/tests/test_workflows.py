@@ -1,12 +1,18 @@
-from .test_auth import auth_headers
+import json
 
+import pytest
 
-def test_create_workflow(client):
-    res = client.post("/api/auth/register", json={"email": "workflow1@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Workflow Project"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
+from app.models.workflow import Workflow, WorkflowStep
+from app.services.workflow_service import create_workflow, execute_workflow_run, trigger_workflow
+
+
+def make_workflow(db_session, project_id, name, trigger_type, steps=()):
+    """Create a workflow through the service; for tests about reading workflows, not creating them."""
+    return create_workflow(db_session, project_id, name, trigger_type, {}, list(steps))
+
+
+def test_create_workflow(client, admin_ctx):
+    _, project_id, headers = admin_ctx
 
     response = client.post(
         f"/api/projects/{project_id}/workflows",
@@ -20,7 +26,7 @@ def test_create_workflow(client):
                 {"action": "delay", "seconds": 5},
             ],
         },
-        headers=auth_headers(token),
+        headers=headers,
     )
     assert response.status_code == 201
     data = response.json()
@@ -32,48 +38,26 @@ def test_create_workflow(client):
     assert "id" in data
 
 
-def test_list_workflows(client):
-    res = client.post("/api/auth/register", json={"email": "workflow2@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "List Workflows Project"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
+def test_list_workflows(client, db_session, admin_ctx):
+    _, project_id, headers = admin_ctx
 
-    client.post(
-        f"/api/projects/{project_id}/workflows",
-        json={"name": "Workflow 1", "trigger_type": "record.created", "steps": []},
-        headers=auth_headers(token),
-    )
-    client.post(
-        f"/api/projects/{project_id}/workflows",
-        json={"name": "Workflow 2", "trigger_type": "record.updated", "steps": []},
-        headers=auth_headers(token),
-    )
+    make_workflow(db_session, project_id, "Workflow 1", "record.created")
+    make_workflow(db_session, project_id, "Workflow 2", "record.updated")
 
-    response = client.get(f"/api/projects/{project_id}/workflows", headers=auth_headers(token))
+    response = client.get(f"/api/projects/{project_id}/workflows", headers=headers)
     assert response.status_code == 200
     data = response.json()
     assert len(data) == 2
-    names = [w["name"] for w in data]
-    assert "Workflow 1" in names
-    assert "Workflow 2" in names
+    names = {w["name"] for w in data}
+    assert {"Workflow 1", "Workflow 2"} <= names
 
 
-def test_get_workflow(client):
-    res = client.post("/api/auth/register", json={"email": "workflow3@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Get Workflow Project"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
+def test_get_workflow(client, db_session, admin_ctx):
+    _, project_id, headers = admin_ctx
 
-    create_response = client.post(
-        f"/api/projects/{project_id}/workflows",
-        json={"name": "Get Test Workflow", "trigger_type": "manual", "steps": [{"action": "transform"}]},
-        headers=auth_headers(token),
-    )
-    workflow_id = create_response.json()["id"]
+    workflow_id = make_workflow(db_session, project_id, "Get Test Workflow", "manual", [{"action": "transform"}]).id
 
-    response = client.get(f"/api/projects/{project_id}/workflows/{workflow_id}", headers=auth_headers(token))
+    response = client.get(f"/api/projects/{project_id}/workflows/{workflow_id}", headers=headers)
     assert response.status_code == 200
     data = response.json()
     assert data["name"] == "Get Test Workflow"
@@ -81,44 +65,20 @@ def test_get_workflow(client):
     assert data["trigger_type"] == "manual"
 
 
-def test_delete_workflow(client):
-    res = client.post("/api/auth/register", json={"email": "workflow4@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Delete Workflow Project"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
+def test_delete_workflow(client, db_session, admin_ctx):
+    _, project_id, headers = admin_ctx
 
-    create_response = client.post(
-        f"/api/projects/{project_id}/workflows",
-        json={"name": "Delete Test Workflow", "trigger_type": "record.deleted", "steps": []},
-        headers=auth_headers(token),
-    )
-    workflow_id = create_response.json()["id"]
+    workflow_id = make_workflow(db_session, project_id, "Delete Test Workflow", "record.deleted").id
 
-    response = client.delete(f"/api/projects/{project_id}/workflows/{workflow_id}", headers=auth_headers(token))
+    response = client.delete(f"/api/projects/{project_id}/workflows/{workflow_id}", headers=headers)
     assert response.status_code == 204
 
-    get_response = client.get(f"/api/projects/{project_id}/workflows/{workflow_id}", headers=auth_headers(token))
+    get_response = client.get(f"/api/projects/{project_id}/workflows/{workflow_id}", headers=headers)
     assert get_response.status_code == 404
 
 
-def test_workflow_not_found(client):
-    res = client.post("/api/auth/register", json={"email": "workflow5@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Not Found Workflow Project"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
-
-    response = client.get(f"/api/projects/{project_id}/workflows/nonexistent-id", headers=auth_headers(token))
-    assert response.status_code == 404
-
-
-def test_create_workflow_without_auth(client):
-    res = client.post("/api/auth/register", json={"email": "workflow6@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Unauth Workflow Project"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
+def test_create_workflow_without_auth(client, admin_ctx):
+    _, project_id, _ = admin_ctx
 
     response = client.post(
         f"/api/projects/{project_id}/workflows",
@@ -127,12 +87,8 @@ def test_create_workflow_without_auth(client):
     assert response.status_code == 401
 
 
-def test_workflow_with_multiple_steps(client):
-    res = client.post("/api/auth/register", json={"email": "workflow7@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Multi-Step Project"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
+def test_workflow_with_multiple_steps(client, admin_ctx):
+    _, project_id, headers = admin_ctx
 
     response = client.post(
         f"/api/projects/{project_id}/workflows",
@@ -146,27 +102,81 @@ def test_workflow_with_multiple_steps(client):
                 {"action": "transform"},
             ],
         },
-        headers=auth_headers(token),
+        headers=headers,
     )
     assert response.status_code == 201
     data = response.json()
     assert len(data["steps"]) == 4
 
 
-def test_workflow_minimal(client):
-    res = client.post("/api/auth/register", json={"email": "workflow8@example.com", "password": "password123"})
-    token = res.json()["access_token"]
-    
-    project_res = client.post("/api/projects", json={"name": "Minimal Workflow Project"}, headers=auth_headers(token))
-    project_id = project_res.json()["id"]
+def test_workflow_minimal(client, admin_ctx):
+    _, project_id, headers = admin_ctx
 
     response = client.post(
         f"/api/projects/{project_id}/workflows",
         json={"name": "Minimal Workflow", "trigger_type": "manual"},
-        headers=auth_headers(token),
+        headers=headers,
     )
     assert response.status_code == 201
     data = response.json()
     assert data["name"] == "Minimal Workflow"
     assert data["steps"] == []
     assert data["trigger_config"] == {}
+
+
+@pytest.mark.asyncio
+async def test_workflow_run_layers_independent_steps(client, db_session, admin_ctx):
+    _, project_id, headers = admin_ctx
+
+    response = client.post(
+        f"/api/projects/{project_id}/workflows",
+        json={
+            "name": "DAG Workflow",
+            "trigger_type": "manual",
+            "steps": [
+                {"action": "transform", "depends_on": []},
+                {"action": "transform", "depends_on": []},
+                {"action": "transform", "depends_on": [0, 1]},
+                {"action": "transform"},
+            ],
+        },
+        headers=headers,
+    )
+    assert response.status_code == 201
+    workflow = db_session.get(Workflow, response.json()["id"])
+
+    run = trigger_workflow(db_session, workflow, {"source": "test"})
+    assert await execute_workflow_run(db_session, run, workflow) is True
+    assert run.status == "completed"
+
+    steps = db_session.query(WorkflowStep).filter(WorkflowStep.run_id == run.id).order_by(WorkflowStep.step_index).all()
+    seen = [json.loads(step.output_json)["input_keys"] for step in steps]
+    assert seen[0] == ["trigger"]
+    assert seen[1] == ["trigger"]
+    assert seen[2] == ["trigger", "step_0", "step_1"]
+    assert seen[3] == ["trigger", "step_0", "step_1", "step_2"]
+
+
+@pytest.mark.asyncio
+async def test_workflow_run_skips_steps_after_failed_layer(db_session, admin_ctx):
+    _, project_id, _ = admin_ctx
+    workflow = make_workflow(db_session, project_id, "Failing Workflow", "manual", [
+        {"action": "http_request", "url": "not-a-url"},
+        {"action": "transform", "depends_on": []},
+        {"action": "transform"},
+    ])
+
+    run = trigger_workflow(db_session, workflow, {})
+    assert await execute_workflow_run(db_session, run, workflow) is False
+    assert run.status == "failed"
+
+    steps = db_session.query(WorkflowStep).filter(WorkflowStep.run_id == run.id).order_by(WorkflowStep.step_index).all()
+    assert [step.status for step in steps] == ["failed", "completed", "skipped"]
+
+
+def test_trigger_data_with_int_keys_and_big_ints(db_session, admin_ctx):
+    _, project_id, _ = admin_ctx
+    workflow = make_workflow(db_session, project_id, "Loose JSON Workflow", "manual")
+
+    run = trigger_workflow(db_session, workflow, {1: "int key", "big": 2**70})
+    assert json.loads(run.trigger_data_json) == {"1": "int key", "big": 2**70}
@@ -20,7 +20,7 @@ import os
 # Add the app directory to the path
 sys.path.insert(0, '/app')
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
 from app.db.session import SessionLocal
 from app.models.user import User
 from app.models.project import Project
@@ -47,14 +47,17 @@ def create_todo_app_project(db: Session, owner_email: str = "admin@example.com")
             is_active=True,
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
         print(f"  Created user with ID: {user.id}")
     else:
         print(f"Using existing user: {user.email} (ID: {user.id})")
     
-    # 2. Create the project
-    project = db.query(Project).filter(Project.name == "Todo App").first()
+    # 2. Create the project. Its auth settings, collections, fields and policies are
+    # loaded with it, so the existence checks below need no further queries.
+    project = db.query(Project).options(
+        joinedload(Project.auth_settings),
+        selectinload(Project.collections).selectinload(Collection.fields),
+        selectinload(Project.collections).selectinload(Collection.policies),
+    ).filter(Project.name == "Todo App").first()
     if project:
         print(f"Project 'Todo App' already exists with ID: {project.id}")
     else:
@@ -65,12 +68,10 @@ def create_todo_app_project(db: Session, owner_email: str = "admin@example.com")
             owner_id=user.id,
         )
         db.add(project)
-        db.commit()
-        db.refresh(project)
         print(f"Created project 'Todo App' with ID: {project.id}")
     
     # 3. Configure auth settings
-    auth_settings = db.query(AuthSettings).filter(AuthSettings.project_id == project.id).first()
+    auth_settings = project.auth_settings
     if auth_settings:
         print("Updating auth settings...")
         auth_settings.email_password_enabled = True
@@ -92,14 +93,10 @@ def create_todo_app_project(db: Session, owner_email: str = "admin@example.com")
             github_oauth_enabled=False,
         )
         db.add(auth_settings)
-    db.commit()
     print("  Auth settings configured: email/password, OTP, magic link enabled")
     
     # 4. Create the todos collection
-    collection = db.query(Collection).filter(
-        Collection.project_id == project.id,
-        Collection.name == "todos"
-    ).first()
+    collection = next((c for c in project.collections if c.name == "todos"), None)
     
     if collection:
         print(f"Collection 'todos' already exists with ID: {collection.id}")
@@ -113,8 +110,7 @@ def create_todo_app_project(db: Session, owner_email: str = "admin@example.com")
             description="User todo items",
         )
         db.add(collection)
-        db.commit()
-        db.refresh(collection)
+        db.flush()
         print(f"  Created collection with ID: {collection.id}")
         
         # Create the actual table in the database
@@ -122,16 +118,17 @@ def create_todo_app_project(db: Session, owner_email: str = "admin@example.com")
         print("  Created database table for todos")
     
     # 5. Create fields for the collection
-    existing_fields = {f.name for f in db.query(Field).filter(Field.collection_id == collection.id).all()}
+    existing_fields = {f.name for f in collection.fields}
     
     fields_to_create = [
         {"name": "title", "display_name": "Title", "field_type": "text", "is_required": True},
         {"name": "completed", "display_name": "Completed", "field_type": "boolean", "is_required": False},
     ]
     
+    new_fields = []
     for field_def in fields_to_create:
         if field_def["name"] not in existing_fields:
-            field = Field(
+            new_fields.append(Field(
                 id=str(uuid.uuid4()),
                 collection_id=collection.id,
                 name=field_def["name"],
@@ -140,19 +137,18 @@ def create_todo_app_project(db: Session, owner_email: str = "admin@example.com")
                 is_required=field_def.get("is_required", False),
                 is_unique=False,
                 is_indexed=False,
-            )
-            db.add(field)
-            print(f"  Created field: {field_def['name']} ({field_def['field_type']})")
-            
-            # Add column to the table
-            schema_manager.add_column(db, project.id, "todos", field_def["name"], field_def["field_type"])
+            ))
         else:
             print(f"  Field '{field_def['name']}' already exists")
+    db.add_all(new_fields)
     
-    db.commit()
+    for field in new_fields:
+        print(f"  Created field: {field.name} ({field.field_type})")
+        # Add column to the table
+        schema_manager.add_column(db, project.id, "todos", field.name, field.field_type)
     
     # 6. Create policies for app_user access
-    existing_policies = {p.name for p in db.query(Policy).filter(Policy.collection_id == collection.id).all()}
+    existing_policies = {p.name for p in collection.policies}
     
     policies_to_create = [
         {
@@ -196,9 +192,10 @@ def create_todo_app_project(db: Session, owner_email: str = "admin@example.com")
         },
     ]
     
+    new_policies = []
     for policy_def in policies_to_create:
         if policy_def["name"] not in existing_policies:
-            policy = Policy(
+            new_policies.append(Policy(
                 id=str(uuid.uuid4()),
                 collection_id=collection.id,
                 name=policy_def["name"],
@@ -209,12 +206,13 @@ def create_todo_app_project(db: Session, owner_email: str = "admin@example.com")
                 condition_json=policy_def.get("condition_json"),
                 is_active=True,
                 priority=0,
-            )
-            db.add(policy)
+            ))
             print(f"  Created policy: {policy_def['name']}")
         else:
             print(f"  Policy '{policy_def['name']}' already exists")
+    db.add_all(new_policies)
     
+    # One commit for the whole seed: a failure part-way leaves nothing behind
     db.commit()
     
     print("\n" + "=" * 60)
@@ -241,5 +239,9 @@ if __name__ == "__main__":
     db = SessionLocal()
     try:
         project_id = create_todo_app_project(db)
+    except Exception:
+        # The seed commits once at the end, so a failure leaves the database untouched
+        db.rollback()
+        raise
     finally:
         db.close()